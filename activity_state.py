@@ -0,0 +1,135 @@
+"""Typed, per-activity session state.
+
+Only the state of the activity on screen is kept in the session: switching
+activity replaces it, which releases the previous activity's audio clips and
+prefetch queue.
+"""
+import sys
+from collections import deque
+from dataclasses import dataclass, field, fields, is_dataclass
+from types import MappingProxyType
+
+
+@dataclass(slots=True)
+class VocabularyState:
+    category: str = None
+    practice_word: str = None
+    word_id: str = None
+    audio: str = None
+    # Spaced-repetition deck and the (learner, item id prefix) it was loaded for
+    deck: object = None
+    deck_key: tuple = None
+
+
+@dataclass(slots=True)
+class ComprehensionState:
+    passage: object = None
+    show_questions: bool = False
+    answers_submitted: bool = False
+    audio: str = None
+
+
+@dataclass(slots=True)
+class FlashCardState:
+    card_id: str = None
+    # Cards shown before this one, for the Previous button
+    previous: deque = field(default_factory=lambda: deque(maxlen=50))
+    show_back: bool = False
+    deck: object = None
+    deck_key: tuple = None
+    # (card text, speed, rendered audio) of the card on screen; the clip itself stays in the audio cache
+    audio: tuple = None
+
+
+@dataclass(slots=True)
+class SoundState:
+    sound: tuple = None
+    category: str = None
+    answer_submitted: bool = False
+    audio: str = None
+    prefetch: tuple = None
+
+
+@dataclass(slots=True)
+class WordListeningState:
+    word: str = None
+    pair: tuple = None
+    answer_checked: bool = False
+    audio: str = None
+    prefetch: tuple = None
+
+
+@dataclass(slots=True)
+class InstructionsState:
+    instruction: str = None
+    started: bool = False
+    complete: bool = False
+    audio: str = None
+
+
+@dataclass(slots=True)
+class StoryState:
+    story: object = None
+    started: bool = False
+    answers_submitted: bool = False
+    audio: str = None
+
+
+@dataclass(slots=True)
+class SentenceState:
+    sentence: str = None
+    answer_checked: bool = False
+    accuracy: float = 0
+    audio: str = None
+    prefetch: tuple = None
+
+
+@dataclass(slots=True)
+class PhoneticState:
+    phoneme: str = None
+    practice_word: str = None
+    practice_count: int = 0
+    audio: str = None
+    prefetch: tuple = None
+
+
+# Keyed by the activity names shown in the navigation menu
+ACTIVITY_STATES = {
+    "Sound Recognition": SoundState,
+    "Word Listening": WordListeningState,
+    "Story Time": StoryState,
+    "Following Instructions": InstructionsState,
+    "Phonetic Fun": PhoneticState,
+    "Sentence Practice": SentenceState,
+    "Vocabulary Builder": VocabularyState,
+    "Comprehension Challenge": ComprehensionState,
+    "Flash Cards": FlashCardState,
+}
+
+
+def deep_sizeof(obj, seen=None):
+    """Approximate bytes held by obj and everything it references.
+
+    Read-only content mappings are shared by all sessions and not counted.
+    """
+    if seen is None:
+        seen = set()
+    if id(obj) in seen or isinstance(obj, MappingProxyType):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    elif is_dataclass(obj):
+        size += sum(deep_sizeof(getattr(obj, f.name), seen) for f in fields(obj))
+    elif hasattr(obj, '__slots__'):
+        size += sum(deep_sizeof(getattr(obj, name, None), seen) for name in obj.__slots__)
+    return size
+
+
+def memory_report(session_state):
+    """[(key, approximate bytes)] for every session state entry, largest first"""
+    report = [(str(key), deep_sizeof(value)) for key, value in session_state.items()]
+    return sorted(report, key=lambda entry: entry[1], reverse=True)
@@ -1,33 +1,246 @@
 import streamlit as st
 import random
-from gtts import gTTS
 import os
 import pandas as pd
 import time
-from io import BytesIO
+import uuid
 import base64
+import itertools
 import json
-from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from audio_cache import AudioCache, audio_mime, cache_key
+from audio_server import start_audio_server
+from chunking import split_sentences
+from activity_state import ACTIVITY_STATES, memory_report
+from content_store import ContentStore, WordIndex
+from lexicon import Lexicon
+from minimal_pairs import MinimalPairs
+from metrics import BYTES_BUCKETS, Metrics
+from progress_history import ACTIVITIES, ACTIVITY_CODES, LEVELS, LEVEL_CODES, History, decode_event
+from progress_store import ProgressStore
+from scoring import sentence_accuracy
+import sound_engine
+from srs import AGAIN, GOOD, Deck
+from text_diff import diff_html
+from time_stretch import can_stretch, fetch_stretched, stretched_key
+from transcode import TYPES, UNIVERSAL, Transcoder
+from tts_backends import create_backend_chain
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTENT_DIR = os.environ.get('CONTENT_DIR', os.path.join(APP_DIR, 'content'))
+AUDIO_CACHE_DIR = os.environ.get('AUDIO_CACHE_DIR', os.path.join(APP_DIR, '.audio_cache'))
+# Recent answers kept in memory per session; every answer is also saved to PROGRESS_DB
+HISTORY_LIMIT = int(os.environ.get('HISTORY_LIMIT', 200))
+PROGRESS_DB = os.environ.get('PROGRESS_DB', os.path.join(APP_DIR, 'progress.db'))
+# TTS backends in order of preference, each with an optional timeout, e.g. "gtts:8,espeak:5"
+TTS_BACKENDS = os.environ.get('TTS_BACKENDS', 'gtts,espeak')
+# How many upcoming items each game pre-selects and synthesizes in the background
+PREFETCH_DEPTH = int(os.environ.get('PREFETCH_DEPTH', 3))
+# CMUdict-format pronunciation lexicon, with an optional word list ordered most frequent first
+LEXICON_PATH = os.environ.get('LEXICON_PATH', os.path.join(APP_DIR, 'data', 'cmudict-sample.dict'))
+LEXICON_FREQUENCY_PATH = os.environ.get('LEXICON_FREQUENCY_PATH')
+# Most lexicon words added to each phonetic practice set
+LEXICON_WORDS = int(os.environ.get('LEXICON_WORDS', 200))
+# Words shown per page in the vocabulary and phonetic word lists
+PAGE_SIZE = int(os.environ.get('PAGE_SIZE', 12))
+PLAYLIST_HEIGHT = 80
+# Playback rate of "Slow Audio Speed" when clips cannot be stretched here (MP3 without ffmpeg)
+SLOW_RATE = 0.75
+# Clips are inlined unless AUDIO_BASE_URL, the address browsers reach the audio server at
+# (e.g. a reverse-proxy path on the app's own origin), is set; then they are served by URL
+AUDIO_BASE_URL = os.environ.get('AUDIO_BASE_URL')
+AUDIO_SERVER_HOST = os.environ.get('AUDIO_SERVER_HOST', '127.0.0.1')
+AUDIO_SERVER_PORT = int(os.environ.get('AUDIO_SERVER_PORT', 8502))
+# Set SERVE_METRICS=1 to also expose /metrics and /metrics.json on the audio server
+SERVE_METRICS = os.environ.get('SERVE_METRICS') == '1'
+
+@st.cache_resource
+def get_content():
+    """Learning content, loaded once per process and shared read-only by every session"""
+    return ContentStore.from_directory(CONTENT_DIR)
+
+@st.cache_resource
+def get_word_index(set_name, level, category):
+    """Searchable index of a category's words, built once per process"""
+    return WordIndex(get_content().items(set_name, level, category))
+
+@st.cache_resource
+def get_lexicon():
+    """Memory-mapped pronunciation lexicon, or None when it cannot be loaded"""
+    try:
+        return Lexicon.load(LEXICON_PATH, LEXICON_FREQUENCY_PATH)
+    except (OSError, ValueError) as e:
+        print(f"Pronunciation lexicon unavailable: {e}")
+        return None
+
+@st.cache_resource
+def get_phonics_index(level, pattern):
+    """The curated words for a spelling pattern followed by matching lexicon words for the level"""
+    words = list(get_content().items('phonemes', level, pattern))
+    lexicon = get_lexicon()
+    if lexicon is not None:
+        curated = set(words)
+        words.extend(w for w in lexicon.find(grapheme=pattern, level=level, limit=LEXICON_WORDS) if w not in curated)
+    return WordIndex(words)
+
+@st.cache_resource
+def get_minimal_pairs():
+    """Future of the lexicon's minimal pairs, computed once per process in the background"""
+    lexicon = get_lexicon()
+    if lexicon is None:
+        return None
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='minimal-pairs').submit(MinimalPairs, lexicon)
+
+def ready_minimal_pairs():
+    """The generated minimal pairs if they are ready, else None"""
+    future = get_minimal_pairs()
+    if future is None or not future.done() or future.exception() is not None:
+        return None
+    return future.result()
+
+def word_list_page(index, key):
+    """Search box and pager over a word list; returns the positions of the words on the current page"""
+    query = st.text_input("🔍 Search words", key=f"{key}_search").strip()
+    positions = index.search(query)
+    pages = max(1, -(-len(positions) // PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, key=f"{key}_page_{query}")
+    st.caption(f"{len(positions)} of {len(index)} words")
+    return positions[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+
+def item_audio_texts(set_name, item):
+    """Strings an activity may synthesize for one content item"""
+    if set_name == 'word_pairs':
+        return list(item)
+    if set_name in ('passages', 'stories'):
+        # Long texts are synthesized sentence by sentence
+        return split_sentences(item['text'])
+    if set_name == 'flash_cards':
+        return [flash_card_audio_text(item)]
+    if set_name == 'sounds':
+        # Known sounds are synthesized locally; only the rest fall back to reading the description
+        return [] if sound_engine.has_sound(item[0]) else [item[1]]
+    return [item]
+
+def lexicon_audio_texts():
+    """Yield the lexicon words the activities can send to TTS: added phonics words and generated minimal pairs"""
+    content = get_content()
+    for level in content.levels('phonemes'):
+        for pattern in content.categories('phonemes', level):
+            yield from get_phonics_index(level, pattern).words
+    future = get_minimal_pairs()
+    if future is None or future.exception() is not None:
+        return
+    pairs = future.result()
+    for level in pairs.pairs:
+        for number in range(pairs.count(level)):
+            yield from pairs.pair(level, number)
+
+def iter_audio_texts(lexicon=False):
+    """Yield every distinct string the activities can send to TTS, optionally without lexicon words"""
+    content = get_content()
+    texts = (
+        text
+        for name in content.set_names()
+        for item in content.items(name)
+        for text in item_audio_texts(name, item)
+    )
+    if lexicon:
+        texts = itertools.chain(texts, lexicon_audio_texts())
+    return iter(dict.fromkeys(texts))
+
+@st.cache_resource
+def get_progress_store():
+    """Process-wide SQLite store of every learner's progress"""
+    return ProgressStore(PROGRESS_DB)
+
+def get_learner_id():
+    """Learner identity, kept in the URL so a refresh resumes the same progress"""
+    learner_id = st.query_params.get('learner')
+    if not learner_id:
+        learner_id = uuid.uuid4().hex[:12]
+        st.query_params['learner'] = learner_id
+    return learner_id
+
+def load_learner(learner_id):
+    """Replace the session's progress with a learner's saved progress"""
+    store = get_progress_store()
+    saved = store.load_learner(learner_id) or {'score': 0, 'streak': 0, 'best_streak': 0, 'badges': set()}
+    st.session_state.learner_id = learner_id
+    st.session_state.score = saved['score']
+    st.session_state.streak = saved['streak']
+    st.session_state.badges = saved['badges']
+    st.session_state.saved_progress = (
+        saved['score'], saved['streak'], saved['best_streak'], frozenset(saved['badges'])
+    )
+    st.session_state.history = History(HISTORY_LIMIT, store.recent_events(learner_id, HISTORY_LIMIT))
+    
+    # Seed the running totals from the per-activity aggregates; overall streaks are saved with the learner
+    progress_stats = {(None, None): dict(EMPTY_STATS, streak=saved['streak'], best_streak=saved['best_streak'])}
+    for (activity, level), (attempts, correct) in store.aggregates(learner_id).items():
+        for key in ((None, None), (ACTIVITIES[activity], None), (ACTIVITIES[activity], LEVELS[level])):
+            if key not in progress_stats:
+                progress_stats[key] = dict(EMPTY_STATS)
+            progress_stats[key]['attempts'] += attempts
+            progress_stats[key]['correct'] += correct
+    st.session_state.progress_stats = progress_stats
+
+def save_progress():
+    """Queue the learner's score, streaks and badges for saving if they changed"""
+    snapshot = (
+        st.session_state.score, st.session_state.streak, activity_stats()['best_streak'],
+        frozenset(st.session_state.badges)
+    )
+    if snapshot != st.session_state.saved_progress:
+        get_progress_store().save_learner(st.session_state.learner_id, *snapshot)
+        st.session_state.saved_progress = snapshot
+
+def get_activity_state(activity):
+    """Typed state of the activity on screen; switching activity releases the previous one"""
+    state = st.session_state.get('activity_state')
+    if not isinstance(state, ACTIVITY_STATES[activity]):
+        state = st.session_state.activity_state = ACTIVITY_STATES[activity]()
+    return state
+
+def get_deck(state, set_name, category):
+    """Learner's spaced-repetition deck for a category at the current level"""
+    prefix = f"{set_name}/{st.session_state.current_level}/{category}/"
+    deck_key = (st.session_state.learner_id, prefix)
+    if state.deck_key != deck_key:
+        item_ids = get_content().item_ids(set_name, st.session_state.current_level, category)
+        state.deck = Deck(item_ids, get_progress_store().load_cards(st.session_state.learner_id, prefix))
+        state.deck_key = deck_key
+    return state.deck
+
+def grade_card(deck, item_id, correct):
+    """Reschedule a card after an answer and queue its new state for saving"""
+    card = deck.grade(item_id, GOOD if correct else AGAIN)
+    get_progress_store().save_card(
+        st.session_state.learner_id, item_id, card.ease, card.interval, card.repetitions, card.lapses, card.due
+    )
 
 # Enhanced session state initialization
 def init_session_state():
-    if 'score' not in st.session_state:
-        st.session_state.score = 0
     if 'current_level' not in st.session_state:
         st.session_state.current_level = 'Easy'
     if 'attempts' not in st.session_state:
         st.session_state.attempts = 0
-    if 'streak' not in st.session_state:
-        st.session_state.streak = 0
-    if 'history' not in st.session_state:
-        st.session_state.history = []
-    if 'badges' not in st.session_state:
-        st.session_state.badges = set()
+    learner_id = get_learner_id()
+    if st.session_state.get('learner_id') != learner_id:
+        load_learner(learner_id)
     if 'total_time' not in st.session_state:
         st.session_state.total_time = 0
     if 'start_time' not in st.session_state:
         st.session_state.start_time = time.time()
 
+EMPTY_STATS = {'attempts': 0, 'correct': 0, 'streak': 0, 'best_streak': 0}
+
+def activity_stats(activity=None, level=None):
+    """Running totals for one activity (optionally at one level), or for all activities"""
+    return st.session_state.progress_stats.get((activity, level), EMPTY_STATS)
+
 def update_progress(activity, correct):
     """Update user progress and award badges"""
     if correct:
@@ -40,27 +253,310 @@ def update_progress(activity, correct):
     else:
         st.session_state.streak = 0
 
-    # Record activity in history
-    st.session_state.history.append({
-        'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        'activity': activity,
-        'level': st.session_state.current_level,
-        'result': 'correct' if correct else 'incorrect'
-    })
+    # Keep running totals overall, per activity and per activity and level
+    level = st.session_state.current_level
+    for key in ((None, None), (activity, None), (activity, level)):
+        stats = st.session_state.progress_stats.get(key)
+        if stats is None:
+            stats = st.session_state.progress_stats[key] = dict(EMPTY_STATS)
+        stats['attempts'] += 1
+        if correct:
+            stats['correct'] += 1
+            stats['streak'] += 1
+            stats['best_streak'] = max(stats['best_streak'], stats['streak'])
+        else:
+            stats['streak'] = 0
+
+    # Record activity in history and queue it for the progress store
+    timestamp = time.time()
+    st.session_state.history.append(activity, level, correct, timestamp)
+    get_progress_store().record_event(
+        st.session_state.learner_id, timestamp, ACTIVITY_CODES[activity], LEVEL_CODES[level], correct
+    )
+
+# Bytes of HTML emitted during this script run; the script module is fresh on every run
+RUN_BYTES = {'html': 0, 'audio': 0}
+# 'app' during a full script run; once it finishes, later runs of the activity fragment are 'fragment' reruns
+RUN_SCOPE = {'scope': 'app'}
+
+@st.cache_resource
+def get_metrics():
+    """Process-wide instrumentation shared by every session"""
+    metrics = Metrics()
+    cache = get_audio_cache()
+    metrics.add_collector(lambda: {f"audio_cache_{name}": value for name, value in cache.stats().items()})
+    return metrics
+
+def render_html(html):
+    """Render trusted HTML and count the bytes sent to the browser"""
+    size = len(html.encode('utf-8'))
+    RUN_BYTES['html'] += size
+    if '<audio' in html:
+        RUN_BYTES['audio'] += size
+    st.markdown(html, unsafe_allow_html=True)
+
+def render_playlist(html):
+    """Render a playlist player, which needs scripts and so runs in its own frame"""
+    size = len(html.encode('utf-8'))
+    RUN_BYTES['html'] += size
+    RUN_BYTES['audio'] += size
+    if hasattr(st, 'iframe'):
+        st.iframe(html, height=PLAYLIST_HEIGHT)
+    else:
+        import streamlit.components.v1 as components
+        components.html(html, height=PLAYLIST_HEIGHT)
+
+@st.cache_resource
+def get_audio_cache():
+    """Process-wide audio cache shared by every learner session"""
+    return AudioCache(
+        AUDIO_CACHE_DIR,
+        memory_limit=int(os.environ.get('AUDIO_CACHE_MEMORY_MB', 32)) * 1024 * 1024,
+        disk_limit=int(os.environ.get('AUDIO_CACHE_DISK_MB', 512)) * 1024 * 1024,
+    )
+
+@st.cache_resource
+def get_tts_executor():
+    """Shared worker pool for background audio synthesis"""
+    return ThreadPoolExecutor(
+        max_workers=int(os.environ.get('TTS_WORKERS', 4)),
+        thread_name_prefix='tts'
+    )
+
+@st.cache_resource
+def get_tts_chain():
+    """TTS backends in order of preference, shared by every session"""
+    return create_backend_chain(TTS_BACKENDS, metrics=get_metrics())
+
+@st.cache_resource
+def get_transcoder():
+    """Shared creator of low-bitrate clip variants; inactive when ffmpeg is missing"""
+    return Transcoder(get_audio_cache(), executor=get_tts_executor(), metrics=get_metrics())
+
+def stretch_available():
+    """Whether the primary backend's clips can be time-stretched here"""
+    return can_stretch(get_tts_chain().primary, get_transcoder().ffmpeg)
+
+def audio_key(text, rate=1.0, lang='en'):
+    """Cache key of the primary backend's clip for text, played at rate"""
+    primary = get_tts_chain().primary.name
+    if rate != 1 and not stretch_available():
+        # Slower speech is then the backend's own slow clip
+        return cache_key(text, lang, rate < 1, primary)
+    key = cache_key(text, lang, False, primary)
+    return key if rate == 1 else stretched_key(key, rate)
+
+def synthesize_clip(text, rate=1.0, lang='en'):
+    """Return (cache key, audio bytes) for text at rate, synthesizing only on a cache miss"""
+    transcoder = get_transcoder()
+    return fetch_stretched(
+        get_audio_cache(), get_tts_chain(), text, rate, lang,
+        executor=get_tts_executor(), ffmpeg=transcoder.ffmpeg, compact=transcoder.compact
+    )
+
+def synthesize_audio(text, rate=1.0, lang='en'):
+    """Return audio bytes for text at rate, synthesizing only on a cache miss"""
+    return synthesize_clip(text, rate=rate, lang=lang)[1]
 
-def get_audio_html(text, slow=False):
+def prefetch_audio(text, rate=1.0, lang='en'):
+    """Warm the audio cache for text, and its low-bitrate variants, on the shared worker pool"""
+    cache = get_audio_cache()
+    if cache.contains(audio_key(text, rate=rate, lang=lang)):
+        return None
+    chain, transcoder = get_tts_chain(), get_transcoder()
+
+    def warm():
+        key, audio_bytes = fetch_stretched(
+            cache, chain, text, rate, lang, ffmpeg=transcoder.ffmpeg, compact=transcoder.compact
+        )
+        transcoder.ensure(key, audio_bytes)
+
+    return get_tts_executor().submit(warm)
+
+def next_prefetched(state, scope, pick, audio_text, audio_rate, current=None, warm=None):
+    """Return the next item for an activity from the prefetch queue in its state.
+
+    `pick(previous)` chooses an item to follow `previous`. The queue is kept
+    PREFETCH_DEPTH items ahead and their audio is synthesized on the shared
+    worker pool, so advancing is normally a cache hit. `warm(item)`, when
+    given, replaces synthesizing `audio_text(item)`. Changing `scope`
+    (level, category or speed) discards the queue.
+    """
+    if state.prefetch is None or state.prefetch[0] != scope:
+        state.prefetch = (scope, deque())
+    queue = state.prefetch[1]
+
+    # Drop queued items the learner has since reached another way
+    while queue and queue[0] == current:
+        queue.popleft()
+    item = queue.popleft() if queue else pick(current)
+    last = queue[-1] if queue else item
+    while len(queue) < PREFETCH_DEPTH:
+        last = pick(last)
+        queue.append(last)
+        if warm:
+            warm(last)
+        else:
+            prefetch_audio(audio_text(last), rate=audio_rate)
+    return item
+
+@st.cache_resource
+def get_audio_server():
+    """Background HTTP server for cached clips, or None when not configured or unavailable"""
+    if not AUDIO_BASE_URL or not AUDIO_SERVER_PORT:
+        return None
+    try:
+        return start_audio_server(
+            get_audio_cache(), AUDIO_BASE_URL, AUDIO_SERVER_HOST, AUDIO_SERVER_PORT,
+            metrics=get_metrics() if SERVE_METRICS else None
+        )
+    except OSError as e:
+        print(f"Audio server unavailable, falling back to inline audio: {e}")
+        return None
+
+def clip_sources(key, audio_bytes, server):
+    """(src, mime) pairs for a cached clip, served by URL when the audio server is up.
+
+    Served clips list every variant smallest first and the browser fetches
+    only the first it can play; inlined clips carry just the smallest one
+    every browser can play.
+    """
+    sources = get_transcoder().sources(key, audio_bytes)
+    if not server:
+        sources = [source for source in sources if source[2] is None or source[2] in UNIVERSAL][:1]
+    pairs = []
+    for source_key, data, variant in sources:
+        mime = TYPES.get(variant) or audio_mime(data)
+        if server:
+            src = server.url_for(source_key)
+        else:
+            src = f"data:{mime};base64,{base64.b64encode(data).decode()}"
+        pairs.append((src, mime))
+    return pairs
+
+def audio_player_html(key, audio_bytes):
+    """<audio> element for a cached clip"""
+    tags = [f'<source src="{src}" type="{mime}">' for src, mime in clip_sources(key, audio_bytes, get_audio_server())]
+    return f'<audio controls>{"".join(tags)}</audio>'
+
+def get_audio_html(text, rate=1.0):
     """Enhanced audio generation with speed control"""
     try:
-        tts = gTTS(text=text, lang='en', slow=slow)
-        audio_fp = BytesIO()
-        tts.write_to_fp(audio_fp)
-        audio_str = base64.b64encode(audio_fp.getvalue()).decode()
-        audio_html = f'<audio controls><source src="data:audio/mp3;base64,{audio_str}"></audio>'
-        return audio_html
+        with get_metrics().timer('get_audio_html_seconds'):
+            key, audio_bytes = synthesize_clip(text, rate=rate)
+        return audio_player_html(key, audio_bytes)
     except Exception as e:
         st.error(f"Error generating audio: {str(e)}")
         return None
 
+def playlist_html(parts):
+    """Player that plays parts in turn; each part is a list of (src, mime) sources"""
+    # Escaped so no source can close the script element early
+    data = json.dumps([[{'src': src, 'type': mime} for src, mime in part] for part in parts]).replace('</', '<\\/')
+    return f"""
+    <audio id="player" controls preload="auto" style="width: 100%"></audio>
+    <div id="part" style="font: 13px sans-serif; color: #666;"></div>
+    <script>
+    const parts = {data};
+    const player = document.getElementById('player');
+    const label = document.getElementById('part');
+    let current = 0;
+    function load(index, autoplay) {{
+        current = index;
+        const sources = parts[index].map(({{src, type}}) =>
+            Object.assign(document.createElement('source'), type ? {{src, type}} : {{src}}));
+        // A part that cannot be fetched is skipped rather than stalling the passage
+        sources[sources.length - 1].addEventListener('error', advance);
+        player.replaceChildren(...sources);
+        label.textContent = parts.length > 1 ? `Part ${{index + 1}} of ${{parts.length}}` : '';
+        player.load();
+        if (autoplay) player.play().catch(() => {{}});
+    }}
+    function advance() {{
+        if (current + 1 < parts.length) load(current + 1, true);
+    }}
+    player.addEventListener('ended', advance);
+    load(0, false);
+    </script>
+    """
+
+def get_passage_audio_html(text, rate=1.0):
+    """Playlist for a long text, synthesized and cached sentence by sentence.
+
+    Every sentence after the first is queued on the shared worker pool at
+    once and the first is synthesized straight away, so playback can start
+    after one sentence. With the audio server, unfinished sentences are
+    handed out by URL and served as soon as they are ready; inlined
+    playlists wait for every sentence.
+    """
+    try:
+        with get_metrics().timer('get_passage_audio_seconds'):
+            chunks = split_sentences(text) or [text]
+            cache, chain, executor = get_audio_cache(), get_tts_chain(), get_tts_executor()
+            transcoder = get_transcoder()
+            rest = [
+                executor.submit(
+                    fetch_stretched, cache, chain, chunk, rate, 'en',
+                    ffmpeg=transcoder.ffmpeg, compact=transcoder.compact
+                )
+                for chunk in chunks[1:]
+            ]
+            clips = [synthesize_clip(chunks[0], rate=rate)]
+            server = get_audio_server()
+            parts = [clip_sources(*clips[0], server)]
+            for chunk, future in zip(chunks[1:], rest):
+                if server and not future.done():
+                    key = audio_key(chunk, rate=rate)
+                    server.expect(key, future)
+                    parts.append([(server.url_for(key), None)])
+                else:
+                    parts.append(clip_sources(*future.result(), server))
+        return playlist_html(parts)
+    except Exception as e:
+        st.error(f"Error generating audio: {str(e)}")
+        return None
+
+def sound_key(name):
+    """Cache key of a procedurally synthesized sound effect in the format it is stored in"""
+    stored = 'mp3' if get_transcoder().available() else 'wav'
+    return cache_key(name, 'sfx', False, f'sound-engine-v{sound_engine.ENGINE_VERSION}-{stored}')
+
+def render_sound(name):
+    """A sound effect compressed to MP3, or as the engine's WAV when ffmpeg is missing"""
+    return get_transcoder().compact(sound_engine.render(name))
+
+def sound_clip(name):
+    """Return (cache key, audio bytes) for a sound effect, rendering it only on a cache miss"""
+    key = sound_key(name)
+    return key, get_audio_cache().get_or_create(key, lambda: render_sound(name))
+
+def prefetch_sound(sound_pair, rate=1.0):
+    """Warm the audio cache for a sound on the shared worker pool"""
+    name, description = sound_pair
+    if not sound_engine.has_sound(name):
+        return prefetch_audio(description, rate=rate)
+    cache, transcoder, key = get_audio_cache(), get_transcoder(), sound_key(name)
+    if cache.contains(key):
+        return None
+
+    def warm():
+        transcoder.ensure(key, cache.get_or_create(key, lambda: render_sound(name)))
+
+    return get_tts_executor().submit(warm)
+
+def get_sound_html(sound_pair, rate=1.0):
+    """Player for a (name, description) sound: the synthesized effect, or its description read aloud"""
+    name, description = sound_pair
+    if not sound_engine.has_sound(name):
+        return get_audio_html(description, rate=rate)
+    try:
+        with get_metrics().timer('get_sound_html_seconds'):
+            key, audio_bytes = sound_clip(name)
+        return audio_player_html(key, audio_bytes)
+    except Exception as e:
+        st.error(f"Error generating sound: {str(e)}")
+        return None
+
 def show_progress_dashboard():
     """Display user progress dashboard"""
     st.sidebar.header("📊 Progress Dashboard")
@@ -73,26 +569,76 @@ def show_progress_dashboard():
     
     # Display statistics
     st.sidebar.subheader("📈 Statistics")
-    total_activities = len(st.session_state.history)
+    stats = activity_stats()
+    total_activities = stats['attempts']
     if total_activities > 0:
-        correct_activities = sum(1 for h in st.session_state.history if h['result'] == 'correct')
+        correct_activities = stats['correct']
         accuracy = (correct_activities / total_activities) * 100
         st.sidebar.metric("Accuracy", f"{accuracy:.1f}%")
     
     st.sidebar.metric("Current Streak", st.session_state.streak)
+    if stats['best_streak'] > 0:
+        st.sidebar.metric("Best Streak", stats['best_streak'])
     
     # Display recent activity
     if st.sidebar.checkbox("Show Recent Activity"):
         st.sidebar.subheader("Recent Activity")
-        recent_history = st.session_state.history[-5:]  # Show last 5 activities
+        recent_history = st.session_state.history.recent(5)  # Show last 5 activities
         for activity in recent_history:
             st.sidebar.markdown(
                 f"**{activity['activity']}** ({activity['level']}) - {activity['result']}"
             )
+    
+    if total_activities > 0:
+        store = get_progress_store()
+        learner_id = st.session_state.learner_id
+        
+        def export_history():
+            store.flush()
+            records = [decode_event(event) for event in store.iter_events(learner_id)]
+            return pd.DataFrame(records).to_csv(index=False)
+        
+        st.sidebar.download_button(
+            "📥 Export History",
+            data=export_history,
+            file_name="learning_history.csv",
+            mime="text/csv"
+        )
+
+def show_admin_panel():
+    """Hidden diagnostics sidebar section, enabled with ?admin=1 in the URL"""
+    st.sidebar.header("🛠️ Admin")
+    with st.sidebar.expander("🧠 Session Memory"):
+        report = memory_report(st.session_state)
+        st.dataframe(pd.DataFrame(report, columns=["Key", "Bytes"]), hide_index=True)
+        st.caption(f"Total: {sum(size for _, size in report) / 1024:.1f} KB")
+    with st.sidebar.expander("📈 Metrics"):
+        metrics = get_metrics()
+        snapshot = metrics.snapshot()
+        gauges = snapshot['gauges']
+        st.metric("Audio Cache Hit Ratio", f"{gauges.get('audio_cache_hit_ratio', 0):.0%}")
+        rows = [
+            {
+                "Metric": h['name'],
+                "Labels": ", ".join(f"{k}={v}" for k, v in h['labels'].items()),
+                "Count": h['count'],
+                "p50": h['p50'],
+                "p95": h['p95'],
+            }
+            for h in snapshot['histograms']
+        ]
+        if rows:
+            st.dataframe(pd.DataFrame(rows), hide_index=True)
+        st.download_button("Metrics (JSON)", metrics.to_json, file_name="metrics.json", mime="application/json")
+        st.download_button("Metrics (Prometheus)", metrics.to_prometheus, file_name="metrics.prom", mime="text/plain")
+        if SERVE_METRICS and get_audio_server() is not None:
+            st.caption("Also scrapeable from /metrics on the audio server.")
 
 def create_listening_module():
     st.title("🎧 Interactive English Learning Hub")
     init_session_state()
+    # Start finding minimal pairs now so they are ready by the time Word Listening is opened
+    get_minimal_pairs()
     
     # Enhanced sidebar navigation
     st.sidebar.header("Navigation")
@@ -102,6 +648,8 @@ def create_listening_module():
      "Following Instructions", "Phonetic Fun", "Sentence Practice",
      "Vocabulary Builder", "Comprehension Challenge", "Flash Cards"]  # Add this
 )
+    # Switching activity releases the state the previous one held
+    get_activity_state(activity_type)
     
     # Settings with additional options
     st.sidebar.header("⚙️ Settings")
@@ -110,81 +658,113 @@ def create_listening_module():
         ["Easy", "Medium", "Hard"]
     )
     
-    # Audio speed control
-    slow_audio = st.sidebar.checkbox("Slow Audio Speed", value=False)
+    # Audio speed control; slower clips are stretched locally from the normal-speed one
+    if stretch_available():
+        audio_rate = round(st.sidebar.slider("Audio Speed", 0.5, 1.25, 1.0, 0.05, format="%.2f×"), 2)
+    else:
+        # Without ffmpeg MP3 clips cannot be stretched, only swapped for the backend's slow speech
+        audio_rate = SLOW_RATE if st.sidebar.checkbox("Slow Audio Speed", value=False) else 1.0
+    
+    # Learner identity; the same ID on any device continues the same progress
+    learner_id = st.sidebar.text_input("👤 Learner ID", value=st.session_state.learner_id).strip()
+    if learner_id and learner_id != st.session_state.learner_id:
+        st.query_params['learner'] = learner_id
+        load_learner(learner_id)
     
     # Display progress dashboard
     show_progress_dashboard()
     
+    activity_fragment(activity_type, audio_rate)
+    
+    if st.query_params.get('admin'):
+        show_admin_panel()
+    RUN_SCOPE['scope'] = 'fragment'
+
+@st.fragment
+def activity_fragment(activity_type, audio_rate):
+    """The selected activity; its own widgets rerun just this, not the sidebar and dashboard.
+
+    Changing activity, level or speed in the sidebar still reruns the whole
+    page, and the progress dashboard catches up then.
+    """
+    if RUN_SCOPE['scope'] == 'fragment':
+        # A fragment rerun sends only what the activity renders
+        RUN_BYTES.update(html=0, audio=0)
+    metrics = get_metrics()
+    metrics.inc('script_runs_total', activity=activity_type, scope=RUN_SCOPE['scope'])
+    
     # Main content area with enhanced error handling
     try:
-        if activity_type == "Sound Recognition":
-            sound_recognition_game(slow_audio)
-        elif activity_type == "Word Listening":
-            word_listening_game(slow_audio)
-        elif activity_type == "Story Time":
-            interactive_story(slow_audio)
-        elif activity_type == "Following Instructions":
-            listening_instructions(slow_audio)
-        elif activity_type == "Phonetic Fun":
-            phonetic_practice(slow_audio)
-        elif activity_type == "Vocabulary Builder":
-            vocabulary_builder(slow_audio)
-        elif activity_type == "Comprehension Challenge":
-            comprehension_challenge(slow_audio)
-        # In the main content area section
-        elif activity_type == "Flash Cards":
-            flash_cards(slow_audio)
-        else:
-            sentence_practice(slow_audio)
+        with metrics.timer('activity_seconds', activity=activity_type):
+            run_activity(activity_type, audio_rate)
     except Exception as e:
         st.error(f"An error occurred: {str(e)}")
         st.button("Reset Activity", on_click=lambda: None)
+    finally:
+        metrics.observe('html_bytes_per_run', RUN_BYTES['html'], buckets=BYTES_BUCKETS, activity=activity_type)
+        metrics.observe('audio_html_bytes_per_run', RUN_BYTES['audio'], buckets=BYTES_BUCKETS, activity=activity_type)
+    
+    save_progress()
 
-def vocabulary_builder(slow_audio=False):
+def run_activity(activity_type, audio_rate):
+    """Dispatch to the selected activity"""
+    if activity_type == "Sound Recognition":
+        sound_recognition_game(audio_rate)
+    elif activity_type == "Word Listening":
+        word_listening_game(audio_rate)
+    elif activity_type == "Story Time":
+        interactive_story(audio_rate)
+    elif activity_type == "Following Instructions":
+        listening_instructions(audio_rate)
+    elif activity_type == "Phonetic Fun":
+        phonetic_practice(audio_rate)
+    elif activity_type == "Vocabulary Builder":
+        vocabulary_builder(audio_rate)
+    elif activity_type == "Comprehension Challenge":
+        comprehension_challenge(audio_rate)
+    # In the main content area section
+    elif activity_type == "Flash Cards":
+        flash_cards(audio_rate)
+    else:
+        sentence_practice(audio_rate)
+
+def vocabulary_builder(audio_rate=1.0):
     st.subheader("📚 Vocabulary Builder")
     
-    # Initialize session state for vocabulary builder
-    if 'vocab_category' not in st.session_state:
-        st.session_state.vocab_category = None
-    if 'practice_word' not in st.session_state:
-        st.session_state.practice_word = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    
-    vocabulary_sets = {
-        "Easy": {
-            "colors": ["red", "blue", "green", "yellow", "purple", "orange", "pink"],
-            "animals": ["cat", "dog", "bird", "fish", "rabbit", "horse", "elephant"],
-            "food": ["apple", "banana", "bread", "milk", "rice", "meat", "egg"]
-        },
-        "Medium": {
-            "emotions": ["happy", "excited", "surprised", "worried", "confused", "tired", "proud"],
-            "weather": ["sunny", "rainy", "cloudy", "windy", "stormy", "foggy", "snowy"],
-            "activities": ["running", "swimming", "reading", "writing", "dancing", "singing", "playing"]
-        },
-        "Hard": {
-            "abstract": ["freedom", "courage", "wisdom", "loyalty", "honesty", "patience", "kindness"],
-            "academic": ["hypothesis", "analysis", "theory", "research", "conclusion", "evidence", "experiment"],
-            "professional": ["collaborate", "implement", "negotiate", "coordinate", "facilitate", "delegate", "innovate"]
-        }
-    }
+    state = get_activity_state("Vocabulary Builder")
     
     # Category selection with state management
     new_category = st.selectbox(
         "Choose Category:", 
-        list(vocabulary_sets[st.session_state.current_level].keys()),
+        get_content().categories('vocabulary', st.session_state.current_level),
         key='category_selector'
     )
     
     # Reset practice word when category changes
-    if new_category != st.session_state.vocab_category:
-        st.session_state.vocab_category = new_category
-        st.session_state.practice_word = None
-        st.session_state.current_audio = None
-    
-    if st.session_state.vocab_category:
-        words = vocabulary_sets[st.session_state.current_level][st.session_state.vocab_category]
+    if new_category != state.category:
+        state.category = new_category
+        state.practice_word = None
+        state.audio = None
+    
+    if state.category:
+        word_index = get_word_index('vocabulary', st.session_state.current_level, state.category)
+        words = word_index.words
+        word_ids = get_content().item_ids('vocabulary', st.session_state.current_level, state.category)
+        deck = get_deck(state, 'vocabulary', state.category)
+        
+        def practice(word, word_id):
+            state.practice_word = word
+            state.word_id = word_id
+            state.audio = get_audio_html(word, rate=audio_rate)
+        
+        def hear_again():
+            state.audio = get_audio_html(state.practice_word, rate=audio_rate)
+        
+        def new_word():
+            # The word the learner most needs to review, other than the current one
+            next_id = deck.next_card(skip=state.word_id)
+            if next_id != state.word_id:
+                practice(get_content().item(next_id), next_id)
         
         # Word exploration mode with improved audio handling
         st.subheader("Explore Words")
@@ -193,159 +773,108 @@ def vocabulary_builder(slow_audio=False):
         word_container = st.container()
         
         with word_container:
-            for i, word in enumerate(words):
+            # Only the current page of words gets widgets
+            for i in word_list_page(word_index, f"vocabulary_{state.category}"):
+                word = words[i]
                 col1, col2, col3 = st.columns([2, 2, 1])
                 with col1:
                     # Generate unique key for each audio button
                     if st.button(f"🔊 Play", key=f"play_{word}_{i}"):
-                        st.session_state.current_audio = get_audio_html(word, slow=slow_audio)
+                        state.audio = get_audio_html(word, rate=audio_rate)
                     
                     # Display audio if available
-                    if st.session_state.current_audio and st.session_state.practice_word == word:
-                        st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                    if state.audio and state.practice_word == word:
+                        render_html(state.audio)
                 
                 with col2:
                     st.markdown(f"**{word}**")
                 
                 with col3:
-                    if st.button(f"Practice", key=f"practice_{word}_{i}"):
-                        st.session_state.practice_word = word
-                        st.session_state.current_audio = get_audio_html(word, slow=slow_audio)
-                        st.rerun()
+                    st.button(f"Practice", key=f"practice_{word}_{i}", on_click=practice, args=(word, word_ids[i]))
         
         # Practice mode with improved state management
-        if st.session_state.practice_word:
+        if state.practice_word:
             st.markdown("---")
-            st.subheader(f"Practice: {st.session_state.practice_word}")
+            st.subheader(f"Practice: {state.practice_word}")
             
             # Audio control for practice word
-            if st.button("🔊 Hear Word Again", key="repeat_practice"):
-                st.session_state.current_audio = get_audio_html(st.session_state.practice_word, slow=slow_audio)
-                st.rerun()
+            st.button("🔊 Hear Word Again", key="repeat_practice", on_click=hear_again)
             
-            if st.session_state.current_audio:
-                st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+            if state.audio:
+                render_html(state.audio)
             
             # Practice input
             user_input = st.text_input(
                 "Type what you hear:",
-                key=f"practice_input_{st.session_state.practice_word}"
+                key=f"practice_input_{state.practice_word}"
             )
             
             col1, col2 = st.columns(2)
             with col1:
                 if st.button("Check", key="check_answer"):
-                    if user_input.lower().strip() == st.session_state.practice_word.lower():
+                    if user_input.lower().strip() == state.practice_word.lower():
                         st.success("Perfect! 🎉")
                         update_progress("Vocabulary", True)
+                        grade_card(deck, state.word_id, True)
                         st.session_state.score += 1
                     else:
-                        st.error(f"Try again! The word was: {st.session_state.practice_word}")
+                        st.error(f"Try again! The word was: {state.practice_word}")
                         update_progress("Vocabulary", False)
+                        grade_card(deck, state.word_id, False)
             
             with col2:
-                if st.button("New Word", key="new_word"):
-                    # Choose a different word than the current one
-                    available_words = [w for w in words if w != st.session_state.practice_word]
-                    if available_words:
-                        st.session_state.practice_word = random.choice(available_words)
-                        st.session_state.current_audio = get_audio_html(st.session_state.practice_word, slow=slow_audio)
-                        st.rerun()
+                st.button("New Word", key="new_word", on_click=new_word)
         
         # Add a visual progress indicator
         st.markdown("---")
-        progress = len([w for w in st.session_state.history if w['activity'] == 'Vocabulary' and w['result'] == 'correct'])
+        progress = activity_stats('Vocabulary')['correct']
         st.progress(min(1.0, progress / 10))
         st.markdown(f"Words Mastered: {progress}")
         
-def comprehension_challenge(slow_audio=False):
+def comprehension_challenge(audio_rate=1.0):
     st.subheader("🎯 Comprehension Challenge")
     
-    # Initialize session states
-    if 'current_passage' not in st.session_state:
-        st.session_state.current_passage = None
-    if 'show_questions' not in st.session_state:
-        st.session_state.show_questions = False
-    if 'answers_submitted' not in st.session_state:
-        st.session_state.answers_submitted = False
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    
-    passages = {
-        "Easy": [
-            {
-                "title": "My Pet Dog",
-                "text": "I have a pet dog named Max. He is brown and white. Max loves to play with his ball. He also likes to run in the garden. Every morning, he wakes me up to go for a walk.",
-                "questions": [
-                    {"question": "What is the dog's name?", "answer": "Max"},
-                    {"question": "What color is Max?", "answer": "brown and white"},
-                    {"question": "What does Max like to play with?", "answer": "ball"},
-                    {"question": "Where does Max like to run?", "answer": "garden"},
-                    {"question": "What happens every morning?", "answer": "Max wakes up the owner for a walk"}
-                ]
-            }
-        ],
-        "Medium": [
-            {
-                "title": "The School Garden",
-                "text": "Our school started a garden project last spring. Each class planted different vegetables and flowers. We learned about soil, water, and sunlight. By summer, we had tomatoes, carrots, and beautiful sunflowers. The garden helps us learn about nature and healthy food.",
-                "questions": [
-                    {"question": "When did the garden project start?", "answer": "last spring"},
-                    {"question": "What did the classes plant?", "answer": "vegetables and flowers"},
-                    {"question": "What did students learn about?", "answer": "soil, water, and sunlight"},
-                    {"question": "What grew in the garden?", "answer": "tomatoes, carrots, and sunflowers"},
-                    {"question": "What does the garden help students learn about?", "answer": "nature and healthy food"}
-                ]
-            }
-        ],
-        "Hard": [
-            {
-                "title": "The History of Flight",
-                "text": "Humans have always dreamed of flying like birds. The Wright brothers made this dream come true in 1903 with their first powered flight. Their airplane, the Wright Flyer, stayed in the air for 12 seconds and covered 120 feet. This historic achievement changed transportation forever and led to modern aviation.",
-                "questions": [
-                    {"question": "Who made powered flight possible?", "answer": "Wright brothers"},
-                    {"question": "When was the first powered flight?", "answer": "1903"},
-                    {"question": "What was the name of their airplane?", "answer": "Wright Flyer"},
-                    {"question": "How long did the first flight last?", "answer": "12 seconds"},
-                    {"question": "How far did the first flight go?", "answer": "120 feet"}
-                ]
-            }
-        ]
-    }
+    state = get_activity_state("Comprehension Challenge")
+    
+    passages = get_content()['passages']
     
     # Create containers for better organization
     header_container = st.container()
     passage_container = st.container()
     question_container = st.container()
     
+    def new_challenge():
+        state.passage = random.choice(passages[st.session_state.current_level])
+        state.show_questions = False
+        state.answers_submitted = False
+        state.audio = None
+    
+    def show_questions():
+        state.show_questions = True
+    
     with header_container:
         col1, col2 = st.columns([2, 1])
         with col1:
-            if st.button("🔄 Start New Challenge", key="new_challenge"):
-                st.session_state.current_passage = random.choice(passages[st.session_state.current_level])
-                st.session_state.show_questions = False
-                st.session_state.answers_submitted = False
-                st.session_state.current_audio = None
-                st.rerun()
-    
-    if st.session_state.current_passage:
+            st.button("🔄 Start New Challenge", key="new_challenge", on_click=new_challenge)
+    
+    if state.passage:
         with passage_container:
-            st.markdown(f"## 📖 {st.session_state.current_passage['title']}")
+            st.markdown(f"## 📖 {state.passage['title']}")
             
             # Audio controls
             col1, col2 = st.columns([3, 1])
             with col1:
                 if st.button("🔊 Listen to Passage", key="play_audio"):
-                    st.session_state.current_audio = get_audio_html(
-                        st.session_state.current_passage['text'], 
-                        slow=slow_audio
+                    state.audio = get_passage_audio_html(
+                        state.passage['text'], 
+                        rate=audio_rate
                     )
             
-            if st.session_state.current_audio:
-                st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+            if state.audio:
+                render_playlist(state.audio)
             
             # Display passage in a styled container
-            st.markdown("""
+            render_html("""
             <style>
             .passage-container {
                 background-color: #f8f9fa;
@@ -355,20 +884,18 @@ def comprehension_challenge(slow_audio=False):
                 margin: 10px 0;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
-            st.markdown(f"""
+            render_html(f"""
             <div class="passage-container">
-                {st.session_state.current_passage['text']}
+                {state.passage['text']}
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
-            if not st.session_state.show_questions:
-                if st.button("📝 Ready for Questions", key="show_questions"):
-                    st.session_state.show_questions = True
-                    st.rerun()
+            if not state.show_questions:
+                st.button("📝 Ready for Questions", key="show_questions", on_click=show_questions)
     
-        if st.session_state.show_questions:
+        if state.show_questions:
             with question_container:
                 st.markdown("---")
                 st.markdown("## ❓ Questions")
@@ -376,7 +903,7 @@ def comprehension_challenge(slow_audio=False):
                 # Create a form for questions
                 with st.form(key="question_form"):
                     user_answers = {}
-                    for q in st.session_state.current_passage['questions']:
+                    for q in state.passage['questions']:
                         user_answers[q['question']] = st.text_input(
                             q['question'],
                             key=f"q_{hash(q['question'])}"
@@ -384,11 +911,11 @@ def comprehension_challenge(slow_audio=False):
                     
                     submit_button = st.form_submit_button("📤 Submit Answers")
                     
-                    if submit_button and not st.session_state.answers_submitted:
+                    if submit_button and not state.answers_submitted:
                         correct_count = 0
                         feedback = []
                         
-                        for q in st.session_state.current_passage['questions']:
+                        for q in state.passage['questions']:
                             user_ans = user_answers[q['question']].lower().strip()
                             correct_ans = q['answer'].lower()
                             
@@ -398,10 +925,10 @@ def comprehension_challenge(slow_audio=False):
                             else:
                                 feedback.append(f"❌ {q['question']}: The correct answer was '{q['answer']}'")
                         
-                        score_percentage = (correct_count / len(st.session_state.current_passage['questions'])) * 100
+                        score_percentage = (correct_count / len(state.passage['questions'])) * 100
                         
                         # Display results
-                        st.success(f"Score: {correct_count}/{len(st.session_state.current_passage['questions'])} ({score_percentage:.1f}%)")
+                        st.success(f"Score: {correct_count}/{len(state.passage['questions'])} ({score_percentage:.1f}%)")
                         
                         # Show detailed feedback
                         with st.expander("See Detailed Feedback"):
@@ -411,95 +938,72 @@ def comprehension_challenge(slow_audio=False):
                         # Update progress
                         update_progress("Comprehension", score_percentage >= 80)
                         st.session_state.score += correct_count
-                        st.session_state.answers_submitted = True
+                        state.answers_submitted = True
                 
                 # Show progress
-                if hasattr(st.session_state, 'history'):
-                    comprehension_attempts = len([x for x in st.session_state.history 
-                                               if x['activity'] == 'Comprehension'])
+                if hasattr(st.session_state, 'progress_stats'):
+                    stats = activity_stats('Comprehension')
+                    comprehension_attempts = stats['attempts']
                     if comprehension_attempts > 0:
-                        success_rate = len([x for x in st.session_state.history 
-                                          if x['activity'] == 'Comprehension' 
-                                          and x['result'] == 'correct']) / comprehension_attempts
+                        success_rate = stats['correct'] / comprehension_attempts
                         st.progress(success_rate)
                         st.markdown(f"Overall Success Rate: {success_rate*100:.1f}%")
 
-def flash_cards(slow_audio=False):
+def flash_card_audio_text(card):
+    """Text spoken for a flash card: the word followed by its example"""
+    return card['front'] + ". " + card['example']
+
+def flash_cards(audio_rate=1.0):
     st.subheader("💡 Interactive Flash Cards")
     
+    state = get_activity_state("Flash Cards")
+    
     # Flash card data organized by difficulty
-    flash_cards_data = {
-        "Easy": {
-            "Basic Vocabulary": [
-                {"front": "Hello", "back": "A common greeting", "example": "Hello, how are you?"},
-                {"front": "Book", "back": "Something we read", "example": "I love reading this book"},
-                {"front": "Sun", "back": "Bright star in the sky", "example": "The sun is shining"},
-                {"front": "Tree", "back": "Plant with trunk and leaves", "example": "Birds live in the tree"},
-                {"front": "House", "back": "Place where people live", "example": "My house is blue"}
-            ],
-            "Numbers": [
-                {"front": "One", "back": "The first number", "example": "I have one apple"},
-                {"front": "Two", "back": "Double of one", "example": "Two birds are flying"},
-                {"front": "Three", "back": "After two", "example": "Three little pigs"}
-            ]
-        },
-        "Medium": {
-            "Action Words": [
-                {"front": "Running", "back": "Moving fast on feet", "example": "She is running in the park"},
-                {"front": "Dancing", "back": "Moving to music", "example": "They are dancing at the party"},
-                {"front": "Swimming", "back": "Moving through water", "example": "Fish are swimming in the pond"}
-            ],
-            "Emotions": [
-                {"front": "Happy", "back": "Feeling good", "example": "The children are happy"},
-                {"front": "Excited", "back": "Very enthusiastic", "example": "We are excited about the party"},
-                {"front": "Peaceful", "back": "Calm and quiet", "example": "The garden is peaceful"}
-            ]
-        },
-        "Hard": {
-            "Advanced Words": [
-                {"front": "Phenomenal", "back": "Extraordinary, exceptional", "example": "The performance was phenomenal"},
-                {"front": "Serendipity", "back": "Lucky discovery", "example": "Finding this book was serendipity"},
-                {"front": "Resilient", "back": "Able to recover quickly", "example": "She is very resilient"}
-            ],
-            "Idioms": [
-                {"front": "Break a leg", "back": "Good luck", "example": "Break a leg at your performance!"},
-                {"front": "Piece of cake", "back": "Very easy", "example": "The test was a piece of cake"},
-                {"front": "Under the weather", "back": "Feeling sick", "example": "I'm feeling under the weather"}
-            ]
-        }
-    }
+    flash_cards_data = get_content()['flash_cards']
     
     # Category selection
     category = st.selectbox(
         "Choose Category:",
-        list(flash_cards_data[st.session_state.current_level].keys())
+        get_content().categories('flash_cards', st.session_state.current_level)
     )
     
     if category:
         cards = flash_cards_data[st.session_state.current_level][category]
+        deck = get_deck(state, 'flash_cards', category)
         
-        # Initialize card index in session state if not present
-        if 'card_index' not in st.session_state:
-            st.session_state.card_index = 0
-        if 'show_back' not in st.session_state:
-            st.session_state.show_back = False
+        # Start from the most due card when the deck changes
+        if state.card_id is None or not state.card_id.startswith(state.deck_key[1]):
+            state.card_id = deck.next_card()
+            state.previous.clear()
             
+        def previous_card():
+            if state.previous:
+                state.card_id = state.previous.pop()
+                state.show_back = False
+        
+        def next_card():
+            next_id = deck.next_card(skip=state.card_id)
+            if next_id != state.card_id:
+                state.previous.append(state.card_id)
+                state.card_id = next_id
+                state.show_back = False
+        
+        def flip():
+            state.show_back = not state.show_back
+        
         # Navigation buttons
         col1, col2, col3 = st.columns([1, 2, 1])
         with col1:
-            if st.button("⬅️ Previous") and st.session_state.card_index > 0:
-                st.session_state.card_index -= 1
-                st.session_state.show_back = False
+            st.button("⬅️ Previous", on_click=previous_card)
         with col3:
-            if st.button("Next ➡️") and st.session_state.card_index < len(cards) - 1:
-                st.session_state.card_index += 1
-                st.session_state.show_back = False
+            st.button("Next ➡️", on_click=next_card)
                 
         # Display current card
-        current_card = cards[st.session_state.card_index]
+        current_card = get_content().item(state.card_id)
+        card_number = int(state.card_id.rsplit('/', 1)[1]) + 1
         
         # Create a card-like container
-        st.markdown("""
+        render_html("""
         <style>
         .flash-card {
             background-color: #ffffff;
@@ -536,34 +1040,42 @@ def flash_cards(slow_audio=False):
             margin-top: 10px;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """)
         
         # Card container
         card_container = st.container()
         with card_container:
-            st.markdown(f"""
+            render_html(f"""
             <div class="flash-card" id="flashcard">
                 <div class="card-content">
-                    {current_card['back'] if st.session_state.show_back else current_card['front']}
+                    {current_card['back'] if state.show_back else current_card['front']}
                 </div>
-                {f'<div class="example-text">{current_card["example"]}</div>' if st.session_state.show_back else ''}
+                {f'<div class="example-text">{current_card["example"]}</div>' if state.show_back else ''}
             </div>
             <div class="progress-indicator">
-                Card {st.session_state.card_index + 1} of {len(cards)}
+                Card {card_number} of {len(cards)} · {len(deck.new)} not yet studied
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
         # Flip button
         col1, col2, col3 = st.columns([2, 1, 2])
         with col2:
-            if st.button("🔄 Flip Card"):
-                st.session_state.show_back = not st.session_state.show_back
+            st.button("🔄 Flip Card", on_click=flip)
         
-        # Audio button
-        audio_text = current_card['front'] + ". " + current_card['example']
-        audio_html = get_audio_html(audio_text, slow=slow_audio)
+        # The current card's player is reused across flips; other cards are rebuilt from the audio cache
+        audio_text = flash_card_audio_text(current_card)
+        if state.audio is not None and state.audio[:2] == (audio_text, audio_rate):
+            audio_html = state.audio[2]
+        else:
+            audio_html = get_audio_html(audio_text, rate=audio_rate)
+            state.audio = (audio_text, audio_rate, audio_html) if audio_html else None
         if audio_html:
-            st.markdown(audio_html, unsafe_allow_html=True)
+            render_html(audio_html)
+        
+        # Warm the cache for the card most likely to come next while this one is studied
+        upcoming = deck.next_card(skip=state.card_id)
+        if upcoming != state.card_id:
+            prefetch_audio(flash_card_audio_text(get_content().item(upcoming)), rate=audio_rate)
         
         # Practice section
         st.write("---")
@@ -574,58 +1086,18 @@ def flash_cards(slow_audio=False):
             if user_input.lower().strip() == current_card['front'].lower():
                 st.success("Perfect! 🎉")
                 update_progress("Flash Cards", True)
+                grade_card(deck, state.card_id, True)
                 st.session_state.score += 1
             else:
                 st.error(f"Keep practicing! The correct answer is: {current_card['front']}")
                 update_progress("Flash Cards", False)
-def sound_recognition_game(slow_audio=False):
+                grade_card(deck, state.card_id, False)
+def sound_recognition_game(audio_rate=1.0):
     st.subheader("👂 Sound Recognition Game")
     
-    # Initialize session states
-    if 'current_sound' not in st.session_state:
-        st.session_state.current_sound = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    if 'current_category' not in st.session_state:
-        st.session_state.current_category = None
-    if 'answer_submitted' not in st.session_state:
-        st.session_state.answer_submitted = False
-    
-    sounds_data = {
-        "Easy": {
-            "animal_sounds": {
-                "cat": "meow sound",
-                "dog": "barking sound",
-                "cow": "mooing sound",
-                "bird": "chirping sound",
-                "duck": "quacking sound",
-                "horse": "neighing sound",
-                "sheep": "baaing sound"
-            }
-        },
-        "Medium": {
-            "nature_sounds": {
-                "rain": "rain falling",
-                "wind": "wind blowing",
-                "thunder": "thunder cracking",
-                "waves": "ocean waves",
-                "fire": "fire crackling",
-                "leaves": "leaves rustling",
-                "stream": "water flowing"
-            }
-        },
-        "Hard": {
-            "instrument_sounds": {
-                "piano": "piano notes",
-                "guitar": "guitar strumming",
-                "drums": "drum beats",
-                "violin": "violin playing",
-                "flute": "flute melody",
-                "trumpet": "trumpet sound",
-                "xylophone": "xylophone notes"
-            }
-        }
-    }
+    state = get_activity_state("Sound Recognition")
+    
+    sounds_data = get_content()['sounds']
     
     # Create containers for better organization
     header_container = st.container()
@@ -634,10 +1106,34 @@ def sound_recognition_game(slow_audio=False):
     
     with header_container:
         category = sounds_data[st.session_state.current_level]
-        sound_type = random.choice(list(category.keys()))
+        sound_type = random.choice(get_content().categories('sounds', st.session_state.current_level))
+        sounds = get_content().items('sounds', st.session_state.current_level, sound_type)
+        
+        def next_sound(current):
+            return next_prefetched(
+                state,
+                (st.session_state.current_level, sound_type, audio_rate),
+                lambda previous: random.choice(sounds),
+                lambda sound_pair: sound_pair[1],
+                audio_rate,
+                current,
+                warm=lambda sound_pair: prefetch_sound(sound_pair, rate=audio_rate)
+            )
+        
+        def new_sound():
+            sound_pair = next_sound(state.sound)
+            state.sound = sound_pair
+            state.audio = get_sound_html(sound_pair, rate=audio_rate)
+            state.category = sound_type
+            state.answer_submitted = False
+        
+        def reset():
+            state.sound = None
+            state.audio = None
+            state.answer_submitted = False
         
         # Display current category with styling
-        st.markdown(f"""
+        render_html(f"""
         <div style='
             background-color: #f0f7ff;
             padding: 15px;
@@ -649,33 +1145,22 @@ def sound_recognition_game(slow_audio=False):
                 {sound_type.replace('_', ' ').title()}
             </h3>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     with game_container:
         col1, col2 = st.columns([3, 1])
         with col1:
-            if st.button("🎵 Play New Sound", key="new_sound"):
-                # Reset states for new sound
-                sound_pair = random.choice(list(category[sound_type].items()))
-                st.session_state.current_sound = sound_pair
-                st.session_state.current_audio = get_audio_html(sound_pair[1], slow=slow_audio)
-                st.session_state.current_category = sound_type
-                st.session_state.answer_submitted = False
-                st.rerun()
+            st.button("🎵 Play New Sound", key="new_sound", on_click=new_sound)
         
         with col2:
-            if st.button("🔄 Reset", key="reset_game"):
-                st.session_state.current_sound = None
-                st.session_state.current_audio = None
-                st.session_state.answer_submitted = False
-                st.rerun()
+            st.button("🔄 Reset", key="reset_game", on_click=reset)
     
-        if st.session_state.current_sound and st.session_state.current_audio:
+        if state.sound and state.audio:
             # Display audio player
-            st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+            render_html(state.audio)
             
             # Create a styled container for options
-            st.markdown("""
+            render_html("""
             <style>
             .stRadio > label {
                 background-color: #f8f9fa;
@@ -688,50 +1173,42 @@ def sound_recognition_game(slow_audio=False):
                 background-color: #e3f2fd;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
             # Display options
             options = list(category[sound_type].keys())
             user_answer = st.radio(
                 "What made this sound?",
                 options,
-                key=f"answer_{hash(str(st.session_state.current_sound))}"
+                key=f"answer_{hash(str(state.sound))}"
             )
             
             col1, col2, col3 = st.columns([2, 2, 1])
             with col1:
-                if st.button("✅ Check Answer", key="check_answer") and not st.session_state.answer_submitted:
-                    st.session_state.answer_submitted = True
-                    if user_answer == st.session_state.current_sound[0]:
+                if st.button("✅ Check Answer", key="check_answer") and not state.answer_submitted:
+                    state.answer_submitted = True
+                    if user_answer == state.sound[0]:
                         st.success("Correct! 🎉")
                         update_progress("Sound Recognition", True)
                         st.session_state.score += 1
                     else:
-                        st.error(f"Not quite! The correct answer was {st.session_state.current_sound[0]}")
+                        st.error(f"Not quite! The correct answer was {state.sound[0]}")
                         update_progress("Sound Recognition", False)
             
             with col2:
                 if st.button("🔊 Play Again", key="play_again"):
-                    st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                    render_html(state.audio)
             
             with col3:
-                if st.button("➡️ Next", key="next_sound"):
-                    # Reset for next sound
-                    sound_pair = random.choice(list(category[sound_type].items()))
-                    st.session_state.current_sound = sound_pair
-                    st.session_state.current_audio = get_audio_html(sound_pair[1], slow=slow_audio)
-                    st.session_state.answer_submitted = False
-                    st.rerun()
+                st.button("➡️ Next", key="next_sound", on_click=new_sound)
     
     with feedback_container:
-        if hasattr(st.session_state, 'history'):
+        if hasattr(st.session_state, 'progress_stats'):
             # Show progress
-            sound_attempts = len([x for x in st.session_state.history 
-                                if x['activity'] == 'Sound Recognition'])
+            stats = activity_stats('Sound Recognition')
+            sound_attempts = stats['attempts']
             if sound_attempts > 0:
-                success_rate = len([x for x in st.session_state.history 
-                                  if x['activity'] == 'Sound Recognition' 
-                                  and x['result'] == 'correct']) / sound_attempts
+                success_rate = stats['correct'] / sound_attempts
                 
                 st.markdown("### Your Progress")
                 st.progress(success_rate)
@@ -741,48 +1218,10 @@ def sound_recognition_game(slow_audio=False):
                 if hasattr(st.session_state, 'streak'):
                     st.markdown(f"Current Streak: {st.session_state.streak} 🔥")
 
-def word_listening_game(slow_audio=False):
+def word_listening_game(audio_rate=1.0):
     st.subheader("🎯 Word Listening Challenge")
     
-    # Initialize session states
-    if 'current_word' not in st.session_state:
-        st.session_state.current_word = None
-    if 'current_pair' not in st.session_state:
-        st.session_state.current_pair = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    if 'answer_checked' not in st.session_state:
-        st.session_state.answer_checked = False
-    
-    word_pairs = {
-        "Easy": [
-            ("cat", "hat"),
-            ("pen", "pin"),
-            ("ship", "sheep"),
-            ("bed", "bad"),
-            ("fit", "feet"),
-            ("hit", "heat"),
-            ("sit", "seat")
-        ],
-        "Medium": [
-            ("through", "threw"),
-            ("weight", "wait"),
-            ("peace", "piece"),
-            ("hear", "here"),
-            ("write", "right"),
-            ("there", "their"),
-            ("wear", "where")
-        ],
-        "Hard": [
-            ("affect", "effect"),
-            ("principal", "principle"),
-            ("stationary", "stationery"),
-            ("complement", "compliment"),
-            ("desert", "dessert"),
-            ("patient", "patience"),
-            ("weather", "whether")
-        ]
-    }
+    state = get_activity_state("Word Listening")
     
     # Create containers for better organization
     header_container = st.container()
@@ -791,7 +1230,7 @@ def word_listening_game(slow_audio=False):
     
     with header_container:
         # Display level and progress
-        st.markdown(f"""
+        render_html(f"""
         <div style='
             background-color: #f0f7ff;
             padding: 15px;
@@ -803,48 +1242,69 @@ def word_listening_game(slow_audio=False):
                 Level: {st.session_state.current_level}
             </h3>
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     with game_container:
-        current_pairs = word_pairs[st.session_state.current_level]
+        level = st.session_state.current_level
+        curated_pairs = get_content()['word_pairs'][level]
+        generated_pairs = ready_minimal_pairs()
+        pair_count = len(curated_pairs) + (generated_pairs.count(level) if generated_pairs else 0)
+        
+        def pick_word(previous):
+            # Pick a word from a different pair than the previous one, across curated and generated pairs
+            while True:
+                number = random.randrange(pair_count)
+                if number < len(curated_pairs):
+                    pair = tuple(curated_pairs[number])
+                else:
+                    pair = generated_pairs.pair(level, number - len(curated_pairs))
+                if previous is None or pair != previous[0] or pair_count == 1:
+                    return pair, random.choice(pair)
+        
+        def next_word(current):
+            return next_prefetched(
+                state,
+                (st.session_state.current_level, audio_rate),
+                pick_word,
+                lambda item: item[1],
+                audio_rate,
+                current
+            )
+        
+        def new_word(current):
+            # Get a new word pair
+            state.pair, state.word = next_word(current)
+            state.audio = get_audio_html(state.word, rate=audio_rate)
+            state.answer_checked = False
+        
+        def reset():
+            state.word = None
+            state.pair = None
+            state.audio = None
+            state.answer_checked = False
         
         col1, col2 = st.columns([3, 1])
         with col1:
-            if st.button("🔊 New Word", key="new_word"):
-                # Get a new word pair
-                pair = random.choice(current_pairs)
-                word = random.choice(pair)
-                
-                # Update session state
-                st.session_state.current_word = word
-                st.session_state.current_pair = pair
-                st.session_state.current_audio = get_audio_html(word, slow=slow_audio)
-                st.session_state.answer_checked = False
-                st.rerun()
+            st.button("🔊 New Word", key="new_word", on_click=new_word, args=(None,))
         
         with col2:
-            if st.button("🔄 Reset", key="reset_game"):
-                st.session_state.current_word = None
-                st.session_state.current_pair = None
-                st.session_state.current_audio = None
-                st.session_state.answer_checked = False
-                st.rerun()
+            st.button("🔄 Reset", key="reset_game", on_click=reset)
         
-        if st.session_state.current_word and st.session_state.current_audio:
+        if state.word and state.audio:
             # Display audio player with styling
-            st.markdown("""
+            render_html("""
             <div style='
                 background-color: #f8f9fa;
                 padding: 15px;
                 border-radius: 10px;
                 margin: 10px 0;
             '>
-            """, unsafe_allow_html=True)
-            st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
-            st.markdown("</div>", unsafe_allow_html=True)
+            """)
+            render_html(state.audio)
+            render_html("</div>")
             
             # Style radio buttons
-            st.markdown("""
+            render_html("""
             <style>
             .stRadio > label {
                 background-color: #f8f9fa;
@@ -857,53 +1317,41 @@ def word_listening_game(slow_audio=False):
                 background-color: #e3f2fd;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
             # Display options
             user_answer = st.radio(
                 "Which word did you hear?",
-                st.session_state.current_pair,
-                key=f"answer_{st.session_state.current_word}"
+                state.pair,
+                key=f"answer_{state.word}"
             )
             
             col1, col2, col3 = st.columns([2, 2, 1])
             with col1:
-                if st.button("✅ Check Answer", key="check_answer") and not st.session_state.answer_checked:
-                    st.session_state.answer_checked = True
-                    if user_answer == st.session_state.current_word:
+                if st.button("✅ Check Answer", key="check_answer") and not state.answer_checked:
+                    state.answer_checked = True
+                    if user_answer == state.word:
                         st.success("Correct! 🎉")
                         update_progress("Word Listening", True)
                         st.session_state.score += 1
                     else:
-                        st.error(f"Not quite! The correct word was '{st.session_state.current_word}'")
+                        st.error(f"Not quite! The correct word was '{state.word}'")
                         update_progress("Word Listening", False)
             
             with col2:
                 if st.button("🔊 Listen Again", key="listen_again"):
-                    st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                    render_html(state.audio)
             
             with col3:
-                if st.button("➡️ Next", key="next_word"):
-                    # Get a new word pair
-                    new_pair = random.choice([p for p in current_pairs if p != st.session_state.current_pair])
-                    new_word = random.choice(new_pair)
-                    
-                    # Update session state
-                    st.session_state.current_word = new_word
-                    st.session_state.current_pair = new_pair
-                    st.session_state.current_audio = get_audio_html(new_word, slow=slow_audio)
-                    st.session_state.answer_checked = False
-                    st.rerun()
+                st.button("➡️ Next", key="next_word", on_click=lambda: new_word((state.pair, state.word)))
     
     with feedback_container:
-        if hasattr(st.session_state, 'history'):
+        if hasattr(st.session_state, 'progress_stats'):
             # Show progress
-            word_attempts = len([x for x in st.session_state.history 
-                               if x['activity'] == 'Word Listening'])
+            stats = activity_stats('Word Listening')
+            word_attempts = stats['attempts']
             if word_attempts > 0:
-                success_rate = len([x for x in st.session_state.history 
-                                  if x['activity'] == 'Word Listening' 
-                                  and x['result'] == 'correct']) / word_attempts
+                success_rate = stats['correct'] / word_attempts
                 
                 st.markdown("### Your Progress")
                 st.progress(success_rate)
@@ -923,38 +1371,12 @@ def word_listening_game(slow_audio=False):
                     - Focus on the subtle differences in pronunciation
                     """)
                 
-def listening_instructions(slow_audio=False):
+def listening_instructions(audio_rate=1.0):
     st.subheader("🎮 Following Instructions Game")
     
-    instructions = {
-        "Easy": [
-            "Touch your nose and count to three",
-            "Raise both hands and wave",
-            "Stand up, turn around, and sit down",
-            "Clap your hands three times",
-            "Point to the door and then to the window",
-            "Pat your head and rub your stomach",
-            "Jump twice and say 'hello'"
-        ],
-        "Medium": [
-            "First touch your toes, then jump twice, and finally clap once",
-            "Draw a circle in the air, point to your eyes, then wave goodbye",
-            "Stand up, spin around twice, then sit and raise your right hand",
-            "Pat your head three times, then your shoulders twice, then clap once",
-            "Touch your left ear with your right hand, then reverse",
-            "Make a triangle shape with your fingers, then point to three objects",
-            "Hop on one foot, switch to the other foot, then clap twice"
-        ],
-        "Hard": [
-            "Touch your nose, right ear, left shoulder, and then clap twice in that exact order",
-            "Stand up, turn clockwise, touch the floor, jump once, and sit down",
-            "Draw a square in the air, then a triangle, then a circle, using the same hand",
-            "Count to five while touching each finger to your thumb in sequence",
-            "Pat your head while rubbing your stomach, then switch actions without stopping",
-            "Point to something red, then blue, then green, then clap for each color",
-            "Make a star shape with your fingers, then trace it in the air with your elbow"
-        ]
-    }
+    state = get_activity_state("Following Instructions")
+    
+    instructions = get_content()['instructions']
     
     # Instructions container
     instruction_container = st.container()
@@ -965,24 +1387,24 @@ def listening_instructions(slow_audio=False):
         if st.button("🎲 New Instruction"):
             # Select random instruction based on current level
             instruction = random.choice(instructions[st.session_state.current_level])
-            st.session_state.current_instruction = instruction
-            st.session_state.instruction_started = True
-            st.session_state.instruction_complete = False
+            state.instruction = instruction
+            state.started = True
+            state.complete = False
             
             # Generate and store audio
-            audio_html = get_audio_html(instruction, slow=slow_audio)
+            audio_html = get_audio_html(instruction, rate=audio_rate)
             if audio_html:
-                st.session_state.current_audio = audio_html
+                state.audio = audio_html
     
     with col2:
-        if st.button("🔄 Repeat Instruction") and hasattr(st.session_state, 'current_audio'):
-            st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+        if st.button("🔄 Repeat Instruction") and state.audio:
+            render_html(state.audio)
     
     # Display current instruction and progress
-    if hasattr(st.session_state, 'instruction_started') and st.session_state.instruction_started:
+    if state.started:
         with instruction_container:
             # Stylized instruction display
-            st.markdown("""
+            render_html("""
             <style>
             .instruction-box {
                 background-color: #f0f7ff;
@@ -998,23 +1420,23 @@ def listening_instructions(slow_audio=False):
                 margin-bottom: 15px;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
-            st.markdown(f"""
+            render_html(f"""
             <div class="instruction-box">
-                <div class="instruction-text">{st.session_state.current_instruction}</div>
+                <div class="instruction-text">{state.instruction}</div>
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
             # Play initial audio
-            if hasattr(st.session_state, 'current_audio'):
-                st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+            if state.audio:
+                render_html(state.audio)
             
             # Progress tracking
             steps_completed = st.checkbox("✅ I have completed all the steps!")
             
-            if steps_completed and not st.session_state.instruction_complete:
-                st.session_state.instruction_complete = True
+            if steps_completed and not state.complete:
+                state.complete = True
                 st.success("Great job following the instructions! 🌟")
                 st.session_state.score += 1
                 update_progress("Instructions", True)
@@ -1039,7 +1461,7 @@ def listening_instructions(slow_audio=False):
                 """)
             
             # Progress tracking
-            st.markdown("""
+            render_html("""
             <style>
             .progress-bar {
                 width: 100%;
@@ -1054,79 +1476,25 @@ def listening_instructions(slow_audio=False):
                 text-align: center;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
             # Show current level progress
             level_progress = min(100, (st.session_state.score / 10) * 100)  # Assuming 10 points per level
-            st.markdown(f"""
+            render_html(f"""
             <div class="progress-bar">
                 <div style="width: {level_progress}%; height: 20px; background-color: #1e88e5; 
                      border-radius: 10px; transition: width 0.5s ease-in-out;">
                 </div>
             </div>
             <div class="progress-text">Level Progress: {level_progress:.0f}%</div>
-            """, unsafe_allow_html=True)
+            """)
             
-def interactive_story(slow_audio=False):
+def interactive_story(audio_rate=1.0):
     st.subheader("📚 Interactive Story Time")
     
-    # Initialize session states
-    if 'current_story' not in st.session_state:
-        st.session_state.current_story = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    if 'answers_submitted' not in st.session_state:
-        st.session_state.answers_submitted = False
-    if 'story_started' not in st.session_state:
-        st.session_state.story_started = False
-    
-    stories = {
-        "Easy": [
-            {
-                "title": "The Kind Lion",
-                "text": "Once there was a kind lion. He helped all the animals in the forest. One day, he found a little mouse in trouble. The lion helped the mouse. Later, the mouse helped the lion too. They became good friends.",
-                "questions": [
-                    "Who is the main character?",
-                    "What did the lion do?",
-                    "Who did the lion help?",
-                    "Did the mouse help the lion too?",
-                    "Where does the story take place?",
-                    "What is the moral of the story?"
-                ],
-                "keywords": ["lion", "mouse", "help", "forest", "friends", "kindness"]
-            }
-        ],
-        "Medium": [
-            {
-                "title": "The Magic Garden",
-                "text": "In Sarah's backyard, there was a special garden. Every night, the flowers would sing sweet lullabies. Butterflies would dance in the moonlight. One day, Sarah discovered that her garden was magical because she had been taking such good care of it.",
-                "questions": [
-                    "Where was the special garden?",
-                    "What did the flowers do at night?",
-                    "What did the butterflies do?",
-                    "Why was the garden magical?",
-                    "Who is Sarah?",
-                    "What is the message of this story?"
-                ],
-                "keywords": ["garden", "flowers", "butterflies", "magic", "care", "Sarah"]
-            }
-        ],
-        "Hard": [
-            {
-                "title": "The Time Machine",
-                "text": "Professor Smith invented a remarkable time machine in his basement laboratory. After years of careful calculations and experiments, he finally completed his creation. However, when he tested it for the first time, something unexpected happened. Instead of traveling through time, he traveled through different dimensions!",
-                "questions": [
-                    "What did Professor Smith invent?",
-                    "Where did he build his invention?",
-                    "How long did it take to complete?",
-                    "What happened during the test?",
-                    "Was the result what he expected?",
-                    "What genre is this story?"
-                ],
-                "keywords": ["time machine", "professor", "invention", "dimensions", "experiment", "laboratory"]
-            }
-        ]
-    }
+    state = get_activity_state("Story Time")
+    
+    stories = get_content()['stories']
     
     # Create containers for better organization
     header_container = st.container()
@@ -1134,29 +1502,31 @@ def interactive_story(slow_audio=False):
     question_container = st.container()
     feedback_container = st.container()
     
+    def new_story():
+        story = random.choice(stories[st.session_state.current_level])
+        state.story = story
+        state.audio = get_passage_audio_html(story['text'], rate=audio_rate)
+        state.answers_submitted = False
+        state.started = True
+    
+    def reset():
+        state.story = None
+        state.audio = None
+        state.answers_submitted = False
+        state.started = False
+    
     with header_container:
         col1, col2 = st.columns([3, 1])
         with col1:
-            if st.button("📖 Start New Story", key="new_story"):
-                story = random.choice(stories[st.session_state.current_level])
-                st.session_state.current_story = story
-                st.session_state.current_audio = get_audio_html(story['text'], slow=slow_audio)
-                st.session_state.answers_submitted = False
-                st.session_state.story_started = True
-                st.rerun()
+            st.button("📖 Start New Story", key="new_story", on_click=new_story)
         
         with col2:
-            if st.button("🔄 Reset", key="reset_story"):
-                st.session_state.current_story = None
-                st.session_state.current_audio = None
-                st.session_state.answers_submitted = False
-                st.session_state.story_started = False
-                st.rerun()
-    
-    if st.session_state.story_started and st.session_state.current_story:
+            st.button("🔄 Reset", key="reset_story", on_click=reset)
+    
+    if state.started and state.story:
         with story_container:
             # Style the story display
-            st.markdown("""
+            render_html("""
             <style>
             .story-container {
                 background-color: #00060CFF;
@@ -1177,31 +1547,31 @@ def interactive_story(slow_audio=False):
                 margin: 10px 0;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
-            st.markdown(f"""
+            render_html(f"""
             <div class="story-container">
-                <div class="story-title">{st.session_state.current_story['title']}</div>
-                {st.session_state.current_story['text']}
+                <div class="story-title">{state.story['title']}</div>
+                {state.story['text']}
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
             # Audio controls
             col1, col2 = st.columns([3, 1])
             with col1:
-                if st.session_state.current_audio:
-                    st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                if state.audio:
+                    render_playlist(state.audio)
             
             with col2:
                 if st.button("🔊 Listen Again", key="listen_again"):
-                    st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                    render_playlist(state.audio)
             
             # Display keywords
-            st.markdown(f"""
+            render_html(f"""
             <div class="keywords">
-                <strong>Keywords:</strong> {', '.join(st.session_state.current_story['keywords'])}
+                <strong>Keywords:</strong> {', '.join(state.story['keywords'])}
             </div>
-            """, unsafe_allow_html=True)
+            """)
         
         with question_container:
             st.markdown("### 📝 Answer these questions:")
@@ -1209,7 +1579,7 @@ def interactive_story(slow_audio=False):
             # Create a form for questions
             with st.form(key='story_questions'):
                 answers = {}
-                for question in st.session_state.current_story['questions']:
+                for question in state.story['questions']:
                     answers[question] = st.text_input(
                         question,
                         key=f"q_{hash(question)}"
@@ -1217,29 +1587,27 @@ def interactive_story(slow_audio=False):
                 
                 submit_button = st.form_submit_button("📤 Submit Answers")
                 
-                if submit_button and not st.session_state.answers_submitted:
+                if submit_button and not state.answers_submitted:
                     correct_count = sum([1 for ans in answers.values() if ans.strip() != ""])
-                    percentage = (correct_count / len(st.session_state.current_story['questions'])) * 100
+                    percentage = (correct_count / len(state.story['questions'])) * 100
                     st.session_state.score += correct_count
                     
                     # Show results
                     if percentage >= 80:
-                        st.success(f"🌟 Excellent! You answered {correct_count} out of {len(st.session_state.current_story['questions'])} questions correctly!")
+                        st.success(f"🌟 Excellent! You answered {correct_count} out of {len(state.story['questions'])} questions correctly!")
                         update_progress("Story Time", True)
                     else:
-                        st.warning(f"📚 Good try! You answered {correct_count} out of {len(st.session_state.current_story['questions'])} questions. Keep practicing!")
+                        st.warning(f"📚 Good try! You answered {correct_count} out of {len(state.story['questions'])} questions. Keep practicing!")
                         update_progress("Story Time", False)
                     
-                    st.session_state.answers_submitted = True
+                    state.answers_submitted = True
     
     with feedback_container:
-        if hasattr(st.session_state, 'history'):
-            story_attempts = len([x for x in st.session_state.history 
-                                if x['activity'] == 'Story Time'])
+        if hasattr(st.session_state, 'progress_stats'):
+            stats = activity_stats('Story Time')
+            story_attempts = stats['attempts']
             if story_attempts > 0:
-                success_rate = len([x for x in st.session_state.history 
-                                  if x['activity'] == 'Story Time' 
-                                  and x['result'] == 'correct']) / story_attempts
+                success_rate = stats['correct'] / story_attempts
                 
                 st.markdown("### 📊 Your Progress")
                 st.progress(success_rate)
@@ -1256,81 +1624,57 @@ def interactive_story(slow_audio=False):
                     - Use context clues to understand new words
                     """)
 
-def sentence_practice(slow_audio=False):
+def sentence_practice(audio_rate=1.0):
     st.subheader("🗣️ Sentence Practice")
     
-    # Initialize session states
-    if 'current_sentence' not in st.session_state:
-        st.session_state.current_sentence = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    if 'answer_checked' not in st.session_state:
-        st.session_state.answer_checked = False
-    if 'current_accuracy' not in st.session_state:
-        st.session_state.current_accuracy = 0
-    
-    sentences = {
-        "Easy": [
-            "The cat sits on the mat.",
-            "I like to play in the park.",
-            "The sun is bright today.",
-            "She has a red book.",
-            "They are going to school.",
-            "The dog runs fast.",
-            "We eat breakfast every morning."
-        ],
-        "Medium": [
-            "The children are playing in the garden after lunch.",
-            "Yesterday, I went to the museum with my family.",
-            "The beautiful butterfly landed on the yellow flower.",
-            "She enjoys reading books under the big tree.",
-            "The teacher explained the lesson carefully.",
-            "They built a sandcastle at the beach.",
-            "The stars twinkle brightly in the night sky."
-        ],
-        "Hard": [
-            "Although it was raining heavily, they continued their journey through the forest.",
-            "The scientist discovered a remarkable new species of butterfly in the Amazon rainforest.",
-            "Despite the challenging circumstances, she persevered and achieved her goals.",
-            "The ancient manuscript revealed secrets about the forgotten civilization.",
-            "The spectacular aurora borealis illuminated the northern sky.",
-            "The innovative technology revolutionized the way people communicate.",
-            "The symphony orchestra performed a magnificent concert at the grand hall."
-        ]
-    }
+    state = get_activity_state("Sentence Practice")
+    
+    sentences = get_content()['sentences']
     
     # Create containers for better organization
     header_container = st.container()
     practice_container = st.container()
     feedback_container = st.container()
     
+    def next_sentence(current):
+        # Get a new sentence different from the current one
+        return next_prefetched(
+            state,
+            (st.session_state.current_level, audio_rate),
+            lambda previous: random.choice(
+                [s for s in sentences[st.session_state.current_level] if s != previous]
+            ),
+            lambda sentence: sentence,
+            audio_rate,
+            current
+        )
+    
+    def new_sentence():
+        sentence = next_sentence(state.sentence)
+        state.sentence = sentence
+        state.audio = get_audio_html(sentence, rate=audio_rate)
+        state.answer_checked = False
+        state.accuracy = 0
+    
+    def reset():
+        state.sentence = None
+        state.audio = None
+        state.answer_checked = False
+        state.accuracy = 0
+    
     with header_container:
         # Display level and controls
         col1, col2 = st.columns([3, 1])
         with col1:
-            if st.button("🔄 New Sentence", key="new_sentence"):
-                # Get a new sentence different from the current one
-                available_sentences = [s for s in sentences[st.session_state.current_level] 
-                                    if s != st.session_state.current_sentence]
-                sentence = random.choice(available_sentences)
-                st.session_state.current_sentence = sentence
-                st.session_state.current_audio = get_audio_html(sentence, slow=slow_audio)
-                st.session_state.answer_checked = False
-                st.session_state.current_accuracy = 0
-                st.rerun()
+            st.button("🔄 New Sentence", key="new_sentence", on_click=new_sentence)
         
         with col2:
-            if st.button("🔄 Reset", key="reset_practice"):
-                st.session_state.current_sentence = None
-                st.session_state.current_audio = None
-                st.session_state.answer_checked = False
-                st.session_state.current_accuracy = 0
-                st.rerun()
-    
-    if st.session_state.current_sentence:
+            st.button("🔄 Reset", key="reset_practice", on_click=reset)
+    
+    if state.sentence:
         with practice_container:
             # Style the practice area
-            st.markdown("""
+            render_html("""
             <style>
             .practice-container {
                 background-color: #f8f9fa;
@@ -1351,25 +1695,25 @@ def sentence_practice(slow_audio=False):
                 background-color: #e3f2fd;
             }
             </style>
-            """, unsafe_allow_html=True)
+            """)
             
             # Audio player
-            if st.session_state.current_audio:
-                st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+            if state.audio:
+                render_html(state.audio)
             
             # Display sentence length info
-            st.markdown(f"""
+            render_html(f"""
             <div class="sentence-length">
-                Words: {len(st.session_state.current_sentence.split())} | 
-                Characters: {len(st.session_state.current_sentence)}
+                Words: {len(state.sentence.split())} | 
+                Characters: {len(state.sentence)}
             </div>
-            """, unsafe_allow_html=True)
+            """)
             
             # Input form
             with st.form(key="sentence_form"):
                 user_input = st.text_input(
                     "Type what you heard:",
-                    key=f"input_{hash(st.session_state.current_sentence)}"
+                    key=f"input_{hash(state.sentence)}"
                 )
                 
                 col1, col2, col3 = st.columns([2, 2, 1])
@@ -1378,12 +1722,12 @@ def sentence_practice(slow_audio=False):
                 with col2:
                     listen_button = st.form_submit_button("🔊 Listen Again")
                 with col3:
-                    next_button = st.form_submit_button("➡️ Next")
+                    st.form_submit_button("➡️ Next", on_click=new_sentence)
                 
-                if submit_button and not st.session_state.answer_checked:
-                    accuracy = calculate_sentence_accuracy(user_input, st.session_state.current_sentence)
-                    st.session_state.current_accuracy = accuracy
-                    st.session_state.answer_checked = True
+                if submit_button and not state.answer_checked:
+                    accuracy = calculate_sentence_accuracy(user_input, state.sentence)
+                    state.accuracy = accuracy
+                    state.answer_checked = True
                     
                     if accuracy >= 90:
                         st.success(f"Perfect match! 🎉 Accuracy: {accuracy:.1f}%")
@@ -1392,31 +1736,20 @@ def sentence_practice(slow_audio=False):
                     else:
                         st.warning(f"Almost there! Accuracy: {accuracy:.1f}%")
                         # Show difference highlighting
-                        show_difference_highlighting(user_input, st.session_state.current_sentence)
+                        show_difference_highlighting(user_input, state.sentence)
                         update_progress("Sentence Practice", False)
                 
                 if listen_button:
-                    st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
-                
-                if next_button:
-                    available_sentences = [s for s in sentences[st.session_state.current_level] 
-                                        if s != st.session_state.current_sentence]
-                    new_sentence = random.choice(available_sentences)
-                    st.session_state.current_sentence = new_sentence
-                    st.session_state.current_audio = get_audio_html(new_sentence, slow=slow_audio)
-                    st.session_state.answer_checked = False
-                    st.session_state.current_accuracy = 0
-                    st.rerun()
+                    render_html(state.audio)
+
     
     with feedback_container:
-        if hasattr(st.session_state, 'history'):
+        if hasattr(st.session_state, 'progress_stats'):
             # Show progress
-            sentence_attempts = len([x for x in st.session_state.history 
-                                   if x['activity'] == 'Sentence Practice'])
+            stats = activity_stats('Sentence Practice')
+            sentence_attempts = stats['attempts']
             if sentence_attempts > 0:
-                success_rate = len([x for x in st.session_state.history 
-                                  if x['activity'] == 'Sentence Practice' 
-                                  and x['result'] == 'correct']) / sentence_attempts
+                success_rate = stats['correct'] / sentence_attempts
                 
                 st.markdown("### 📊 Your Progress")
                 st.progress(success_rate)
@@ -1435,97 +1768,32 @@ def sentence_practice(slow_audio=False):
 
 def show_difference_highlighting(user_input, correct_sentence):
     """Show differences between user input and correct sentence"""
-    import difflib
-    
-    d = difflib.Differ()
-    diff = list(d.compare(user_input.lower(), correct_sentence.lower()))
-    
     st.markdown("### Difference Analysis:")
-    st.markdown("""
+    render_html(f"""
     <style>
-    .diff-added { color: #4caf50; font-weight: bold; }
-    .diff-removed { color: #f44336; font-weight: bold; text-decoration: line-through; }
+    .diff-added {{ color: #4caf50; font-weight: bold; }}
+    .diff-removed {{ color: #f44336; font-weight: bold; text-decoration: line-through; }}
     </style>
-    """, unsafe_allow_html=True)
-    
-    diff_html = []
-    for token in diff:
-        if token.startswith('+'):
-            diff_html.append(f'<span class="diff-added">{token[2:]}</span>')
-        elif token.startswith('-'):
-            diff_html.append(f'<span class="diff-removed">{token[2:]}</span>')
-        elif token.startswith(' '):
-            diff_html.append(token[2:])
-    
-    st.markdown(f"""
     <div style="background-color: #f8f9fa; padding: 10px; border-radius: 5px;">
-        {''.join(diff_html)}
+        {diff_html(user_input, correct_sentence)}
     </div>
-    """, unsafe_allow_html=True)
-
-def calculate_sentence_accuracy(user_input, correct_sentence):
-    """Calculate accuracy percentage between user input and correct sentence"""
-    if not user_input:
-        return 0
-    
-    user_words = user_input.lower().split()
-    correct_words = correct_sentence.lower().split()
-    
-    # Word-level accuracy
-    correct_word_count = sum(1 for u, c in zip(user_words, correct_words) if u == c)
-    word_accuracy = (correct_word_count / len(correct_words)) * 100
-    
-    # Character-level accuracy
-    import difflib
-    sequence_matcher = difflib.SequenceMatcher(None, user_input.lower(), correct_sentence.lower())
-    char_accuracy = sequence_matcher.ratio() * 100
-    
-    # Combined accuracy score
-    return (word_accuracy + char_accuracy) / 2
+    """)
 
 def calculate_sentence_accuracy(user_input, correct_sentence):
     """Calculate the accuracy percentage of the user's input"""
-    user_words = user_input.lower().strip().split()
-    correct_words = correct_sentence.lower().strip().split()
-    
-    if not user_words:
-        return 0
-    
-    correct_count = sum(1 for u, c in zip(user_words, correct_words) if u == c)
-    total_words = max(len(user_words), len(correct_words))
-    
-    return (correct_count / total_words) * 100
+    return sentence_accuracy(user_input, correct_sentence)
 
-def phonetic_practice(slow_audio=False):
+def random_other(words, previous):
+    """Random word other than previous, without copying the list"""
+    while True:
+        word = random.choice(words)
+        if word != previous:
+            return word
+
+def phonetic_practice(audio_rate=1.0):
     st.subheader("🔤 Phonetic Fun")
     
-    # Initialize session states
-    if 'selected_phoneme' not in st.session_state:
-        st.session_state.selected_phoneme = None
-    if 'practice_word' not in st.session_state:
-        st.session_state.practice_word = None
-    if 'current_audio' not in st.session_state:
-        st.session_state.current_audio = None
-    if 'practice_count' not in st.session_state:
-        st.session_state.practice_count = 0
-    
-    phonemes = {
-        "Easy": {
-            "th": ["this", "that", "three", "thank", "think", "thumb", "throat"],
-            "sh": ["ship", "shop", "shell", "share", "shake", "shoe", "shine"],
-            "ch": ["chair", "cheese", "church", "chest", "chain", "child", "chips"]
-        },
-        "Medium": {
-            "ph": ["phone", "photo", "phrase", "phantom", "physics", "phonics", "pharmacy"],
-            "wh": ["what", "where", "when", "which", "whale", "wheel", "whistle"],
-            "ck": ["back", "black", "clock", "duck", "kick", "stick", "truck"]
-        },
-        "Hard": {
-            "ough": ["though", "through", "thought", "rough", "cough", "enough", "bought"],
-            "tion": ["action", "motion", "station", "fiction", "nation", "section", "portion"],
-            "ight": ["light", "night", "right", "sight", "fight", "bright", "flight"]
-        }
-    }
+    state = get_activity_state("Phonetic Fun")
     
     # Create containers for better organization
     header_container = st.container()
@@ -1534,7 +1802,7 @@ def phonetic_practice(slow_audio=False):
     feedback_container = st.container()
     
     with header_container:
-        st.markdown("""
+        render_html("""
         <style>
         .phoneme-header {
             background-color: #000000FF;
@@ -1562,77 +1830,99 @@ def phonetic_practice(slow_audio=False):
             margin: 15px 0;
         }
         </style>
-        """, unsafe_allow_html=True)
+        """)
+        
+        def choose_phoneme():
+            state.phoneme = st.session_state.phoneme_selector
+            state.practice_word = None
+            state.audio = None
+        
+        def reset():
+            state.practice_word = None
+            state.audio = None
+            state.practice_count = 0
         
         col1, col2 = st.columns([3, 1])
         with col1:
             new_phoneme = st.selectbox(
                 "Choose a sound to practice:",
-                list(phonemes[st.session_state.current_level].keys()),
-                key='phoneme_selector'
+                get_content().categories('phonemes', st.session_state.current_level),
+                key='phoneme_selector',
+                on_change=choose_phoneme
             )
             
-            if new_phoneme != st.session_state.selected_phoneme:
-                st.session_state.selected_phoneme = new_phoneme
-                st.session_state.practice_word = None
-                st.session_state.current_audio = None
-                st.rerun()
+            # A level change replaces the options and resets the choice without calling back
+            if new_phoneme != state.phoneme:
+                choose_phoneme()
         
         with col2:
-            if st.button("🔄 Reset", key="reset_practice"):
-                st.session_state.practice_word = None
-                st.session_state.current_audio = None
-                st.session_state.practice_count = 0
-                st.rerun()
+            st.button("🔄 Reset", key="reset_practice", on_click=reset)
     
-    if st.session_state.selected_phoneme:
+    if state.phoneme:
         with practice_container:
-            st.markdown(f"""
+            render_html(f"""
             <div class="phoneme-header">
-                <h3>Words with '{st.session_state.selected_phoneme}' sound</h3>
+                <h3>Words with '{state.phoneme}' sound</h3>
                 <p>Click on any word to practice!</p>
             </div>
-            """, unsafe_allow_html=True)
+            """)
+            
+            word_index = get_phonics_index(st.session_state.current_level, state.phoneme)
+            current_words = word_index.words
+            
+            def practice(word):
+                state.practice_word = word
+                state.audio = get_audio_html(word, rate=audio_rate)
             
-            current_words = phonemes[st.session_state.current_level][st.session_state.selected_phoneme]
+            def next_word():
+                practice(next_prefetched(
+                    state,
+                    (st.session_state.current_level, state.phoneme, audio_rate),
+                    lambda previous: random_other(current_words, previous),
+                    lambda word: word,
+                    audio_rate,
+                    state.practice_word
+                ))
             
             # Display words in a grid
             cols = st.columns(3)
-            for idx, word in enumerate(current_words):
+            for idx, position in enumerate(word_list_page(word_index, f"phonemes_{state.phoneme}")):
+                word = current_words[position]
                 with cols[idx % 3]:
-                    st.markdown(f"""
+                    render_html(f"""
                     <div class="word-card">
                         <h4>{word}</h4>
                     </div>
-                    """, unsafe_allow_html=True)
+                    """)
                     
-                    if st.button(f"🔊 Practice", key=f"practice_{word}"):
-                        st.session_state.practice_word = word
-                        st.session_state.current_audio = get_audio_html(word, slow=slow_audio)
-                        st.rerun()
+                    st.button(f"🔊 Practice", key=f"practice_{word}", on_click=practice, args=(word,))
         
-        if st.session_state.practice_word:
+        if state.practice_word:
             with word_container:
-                st.markdown("""
+                render_html("""
                 <div class="practice-area">
-                """, unsafe_allow_html=True)
+                """)
                 
-                st.markdown(f"### Practicing: {st.session_state.practice_word}")
+                st.markdown(f"### Practicing: {state.practice_word}")
+                lexicon = get_lexicon()
+                index = lexicon.index(state.practice_word) if lexicon else None
+                if index is not None:
+                    st.caption(f"Sounds: {' '.join(lexicon.phonemes(index))}")
                 
                 # Audio controls
                 col1, col2 = st.columns([3, 1])
                 with col1:
-                    if st.session_state.current_audio:
-                        st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                    if state.audio:
+                        render_html(state.audio)
                 with col2:
                     if st.button("🔊 Repeat", key="repeat_audio"):
-                        st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
+                        render_html(state.audio)
                 
                 # Practice form
                 with st.form(key="practice_form"):
                     user_input = st.text_input(
                         "Type what you hear:",
-                        key=f"input_{st.session_state.practice_word}"
+                        key=f"input_{state.practice_word}"
                     )
                     
                     col1, col2, col3 = st.columns([2, 2, 1])
@@ -1641,41 +1931,32 @@ def phonetic_practice(slow_audio=False):
                     with col2:
                         listen = st.form_submit_button("🔊 Listen")
                     with col3:
-                        next_word = st.form_submit_button("➡️ Next")
+                        st.form_submit_button("➡️ Next", on_click=next_word, disabled=len(current_words) < 2)
                     
                     if submit:
-                        if user_input.lower().strip() == st.session_state.practice_word.lower():
+                        if user_input.lower().strip() == state.practice_word.lower():
                             st.success("Correct spelling! 🎉")
                             update_progress("Phonetic Practice", True)
                             st.session_state.score += 1
-                            st.session_state.practice_count += 1
+                            state.practice_count += 1
                         else:
-                            st.error(f"The correct spelling is: {st.session_state.practice_word}")
-                            show_difference_highlighting(user_input, st.session_state.practice_word)
+                            st.error(f"The correct spelling is: {state.practice_word}")
+                            show_difference_highlighting(user_input, state.practice_word)
                             update_progress("Phonetic Practice", False)
                     
                     if listen:
-                        st.markdown(st.session_state.current_audio, unsafe_allow_html=True)
-                    
-                    if next_word:
-                        available_words = [w for w in current_words if w != st.session_state.practice_word]
-                        if available_words:
-                            new_word = random.choice(available_words)
-                            st.session_state.practice_word = new_word
-                            st.session_state.current_audio = get_audio_html(new_word, slow=slow_audio)
-                            st.rerun()
+                        render_html(state.audio)
+
                 
-                st.markdown("</div>", unsafe_allow_html=True)
+                render_html("</div>")
     
     with feedback_container:
-        if hasattr(st.session_state, 'history'):
+        if hasattr(st.session_state, 'progress_stats'):
             # Show progress
-            phonetic_attempts = len([x for x in st.session_state.history 
-                                   if x['activity'] == 'Phonetic Practice'])
+            stats = activity_stats('Phonetic Practice')
+            phonetic_attempts = stats['attempts']
             if phonetic_attempts > 0:
-                success_rate = len([x for x in st.session_state.history 
-                                  if x['activity'] == 'Phonetic Practice' 
-                                  and x['result'] == 'correct']) / phonetic_attempts
+                success_rate = stats['correct'] / phonetic_attempts
                 
                 st.markdown("### 📊 Your Progress")
                 st.progress(success_rate)
@@ -1689,7 +1970,7 @@ def phonetic_practice(slow_audio=False):
                     - Practice saying the words out loud
                     - Break down complex sounds
                     - Notice patterns in spelling
-                    - Use the slow audio option for difficult words
+                    - Lower the audio speed for difficult words
                     """)
 
 if __name__ == "__main__":
@@ -0,0 +1,187 @@
+"""Two-tier (memory + disk) content-addressed cache for synthesized audio clips"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+def cache_key(text, lang='en', slow=False, backend='gtts'):
+    """Content hash identifying one synthesized clip"""
+    raw = json.dumps([text, lang, slow, backend], ensure_ascii=False)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Thread-safe LRU cache of audio bytes, kept in memory and mirrored on disk.
+
+    Both tiers are capped in bytes and evict least recently used clips first.
+    Concurrent requests for the same missing key share a single synthesis.
+    """
+
+    def __init__(self, directory, memory_limit=32 * 1024 * 1024, disk_limit=512 * 1024 * 1024):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self.hits = {'memory': 0, 'disk': 0}
+        self.misses = 0
+        self.evictions = {'memory': 0, 'disk': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._scan_disk()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def _scan_disk(self):
+        # Rebuild the disk LRU order from file modification times
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                stat = os.stat(os.path.join(root, name))
+                entries.append((stat.st_mtime, name, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+
+    def _remember(self, key, data):
+        if len(data) > self.memory_limit:
+            return
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_limit:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions['memory'] += 1
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.disk_limit and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.evictions['disk'] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get(self, key):
+        """Return cached bytes for key, or None on a miss"""
+        with self._lock:
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits['memory'] += 1
+                return data
+            on_disk = key in self._disk
+        if on_disk:
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+                os.utime(self._path(key))
+            except OSError:
+                data = None
+            with self._lock:
+                if data is None:
+                    self._disk_bytes -= self._disk.pop(key, 0)
+                else:
+                    self._disk.move_to_end(key)
+                    self._remember(key, data)
+                    self.hits['disk'] += 1
+                    return data
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def contains(self, key):
+        """Check both tiers without touching recency or counters"""
+        with self._lock:
+            return key in self._memory or key in self._disk
+
+    def put(self, key, data):
+        """Store bytes under key in both tiers"""
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._remember(key, data)
+            self._disk_bytes += len(data) - self._disk.pop(key, 0)
+            self._disk[key] = len(data)
+            self._evict_disk()
+
+    def single_flight(self, key, fn):
+        """Run fn() once for concurrent callers sharing key and hand all of them its result"""
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            return future.result()
+        try:
+            result = fn()
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def get_or_create(self, key, factory):
+        """Return cached bytes for key, calling factory() once on a miss"""
+        data = self.get(key)
+        if data is not None:
+            return data
+
+        def create():
+            # A concurrent caller may have stored the clip since our lookup
+            if self.contains(key):
+                cached = self.get(key)
+                if cached is not None:
+                    return cached
+            created = factory()
+            self.put(key, created)
+            return created
+
+        return self.single_flight(key, create)
+
+    def stats(self):
+        """Snapshot of sizes and hit/miss counters"""
+        with self._lock:
+            hits = sum(self.hits.values())
+            lookups = hits + self.misses
+            return {
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes,
+                'memory_hits': self.hits['memory'],
+                'disk_hits': self.hits['disk'],
+                'misses': self.misses,
+                'memory_evictions': self.evictions['memory'],
+                'disk_evictions': self.evictions['disk'],
+                'hit_ratio': hits / lookups if lookups else 0.0,
+            }
+
+
+def audio_mime(data):
+    """Guess the MIME type of encoded audio bytes from their header"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        return 'audio/wav'
+    if data[:4] == b'OggS':
+        return 'audio/ogg'
+    return 'audio/mpeg'
@@ -0,0 +1,172 @@
+"""Small HTTP endpoint that serves cached audio clips under content-hashed URLs.
+
+Clips are immutable once cached (the URL is the hash of what was synthesized),
+so responses carry a strong ETag and a one-year immutable Cache-Control, and
+support HTTP range requests for seeking. A clip that is still being
+synthesized can be registered with `expect`, and requests for it wait until
+it is ready. Only when given, the process metrics are also exposed at
+/metrics (Prometheus text) and /metrics.json.
+"""
+import re
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from audio_cache import audio_mime
+
+AUDIO_PATH = re.compile(r'^/audio/([0-9a-f]{64})(?:\.\w+)?$')
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+# How long a request for a clip still being synthesized waits for it
+PENDING_TIMEOUT = 30.0
+# Expected clips remembered at most; the oldest are forgotten first
+PENDING_LIMIT = 256
+
+
+class AudioRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'AudioServer/1.0'
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body):
+        path = self.path.split('?', 1)[0]
+        if path in ('/metrics', '/metrics.json') and self.server.metrics is not None:
+            self._serve_metrics(path, send_body)
+            return
+        match = AUDIO_PATH.match(path)
+        if not match:
+            self.send_error(404)
+            return
+        key = match.group(1)
+        data = self.server.cache.get(key)
+        if data is None:
+            data = self.server.wait_for(key, PENDING_TIMEOUT)
+        if data is None:
+            self.send_error(404)
+            return
+
+        etag = f'"{key}"'
+        if etag in self.headers.get('If-None-Match', ''):
+            self.send_response(304)
+            self._send_cache_headers(etag)
+            self.end_headers()
+            return
+
+        start, end = 0, len(data) - 1
+        status = 200
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range', etag) == etag:
+            bounds = parse_range(range_header, len(data))
+            if bounds is None:
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{len(data)}')
+                self.end_headers()
+                return
+            start, end = bounds
+            status = 206
+
+        self.send_response(status)
+        self.send_header('Content-Type', audio_mime(data))
+        self.send_header('Content-Length', str(end - start + 1))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{end}/{len(data)}')
+        self._send_cache_headers(etag)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data[start:end + 1])
+
+    def _serve_metrics(self, path, send_body):
+        if path == '/metrics.json':
+            body, content_type = self.server.metrics.to_json(), 'application/json'
+        else:
+            body, content_type = self.server.metrics.to_prometheus(), 'text/plain; version=0.0.4'
+        body = body.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Cache-Control', 'no-store')
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+    def _send_cache_headers(self, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', 'public, max-age=31536000, immutable')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def parse_range(header, size):
+    """Parse a single-range Range header into inclusive (start, end), or None if unsatisfiable"""
+    match = RANGE_HEADER.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if first == '':
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return None
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, end
+
+
+class AudioServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, cache, host, port, base_url, metrics=None):
+        super().__init__((host, port), AudioRequestHandler)
+        self.cache = cache
+        self.metrics = metrics
+        # Where browsers reach this server, e.g. through a reverse proxy; never guessed
+        self.base_url = base_url.rstrip('/')
+        self._pending = OrderedDict()
+        self._pending_lock = threading.Lock()
+
+    def url_for(self, key):
+        """Public URL of the clip cached under key"""
+        return f'{self.base_url}/audio/{key}'
+
+    def expect(self, key, future):
+        """Serve the clip that future (resolving to (cache key, bytes)) will produce at key's URL"""
+        with self._pending_lock:
+            self._pending[key] = future
+            while len(self._pending) > PENDING_LIMIT:
+                self._pending.popitem(last=False)
+
+        def done(finished):
+            # Clips cached under the expected key no longer need the future; fallbacks keep it
+            if finished.exception() is None and finished.result()[0] == key:
+                with self._pending_lock:
+                    if self._pending.get(key) is finished:
+                        del self._pending[key]
+
+        future.add_done_callback(done)
+
+    def wait_for(self, key, timeout):
+        """Bytes of an expected clip once synthesized, or None if unknown, failed or too slow"""
+        with self._pending_lock:
+            future = self._pending.get(key)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout)[1]
+        except Exception:
+            return None
+
+
+def start_audio_server(cache, base_url, host='127.0.0.1', port=8502, metrics=None):
+    """Start serving cache (and metrics at /metrics, /metrics.json) on a daemon thread"""
+    server = AudioServer(cache, host, port, base_url, metrics)
+    thread = threading.Thread(target=server.serve_forever, name='audio-server', daemon=True)
+    thread.start()
+    return server
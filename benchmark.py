@@ -0,0 +1,331 @@
+"""Headless benchmark of every activity, driven through Streamlit's AppTest.
+
+Each activity is taken through a scripted session (start, answer, next, ...)
+with the fake TTS backend, recording per-rerun latency, allocations and the
+bytes of UI sent per rerun. Results are compared with a stored baseline and
+the run fails when any figure regresses beyond the threshold:
+
+    python benchmark.py                    # compare with benchmarks/baseline.json
+    python benchmark.py --update-baseline  # record a new baseline
+    python benchmark.py --check-reruns     # also fail if any interaction runs the script twice
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import urllib.request
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE = os.path.join(APP_DIR, 'benchmarks', 'baseline.json')
+ANSWER = "benchmark answer"
+# Text boxes that filter what is shown rather than take an answer
+SEARCH_LABELS = ("🔍 Search words",)
+
+# Scripted sessions per activity: steps run once, then steps repeated every iteration.
+# A step is (action, label): click a button, type into every text box, pick the
+# first option of every radio group, or toggle a checkbox.
+SCENARIOS = {
+    "Sound Recognition": (
+        [('click', "🎵 Play New Sound")],
+        [('radio', None), ('click', "✅ Check Answer"), ('click', "➡️ Next")],
+    ),
+    "Word Listening": (
+        [('click', "🔊 New Word")],
+        [('radio', None), ('click', "✅ Check Answer"), ('click', "➡️ Next")],
+    ),
+    "Story Time": (
+        [],
+        [('click', "📖 Start New Story"), ('type', None), ('click', "📤 Submit Answers")],
+    ),
+    "Following Instructions": (
+        [],
+        [('click', "🎲 New Instruction"), ('toggle', "✅ I have completed all the steps!")],
+    ),
+    "Phonetic Fun": (
+        [('click', "🔊 Practice")],
+        [('type', None), ('click', "✅ Check"), ('click', "➡️ Next")],
+    ),
+    "Sentence Practice": (
+        [('click', "🔄 New Sentence")],
+        [('type', None), ('click', "✅ Check"), ('click', "➡️ Next")],
+    ),
+    "Vocabulary Builder": (
+        [('click', "Practice")],
+        [('type', None), ('click', "Check"), ('click', "New Word")],
+    ),
+    "Comprehension Challenge": (
+        [],
+        [
+            ('click', "🔄 Start New Challenge"), ('click', "📝 Ready for Questions"),
+            ('type', None), ('click', "📤 Submit Answers"),
+        ],
+    ),
+    "Flash Cards": (
+        [],
+        [('click', "🔄 Flip Card"), ('type', None), ('click', "Check"), ('click', "Next ➡️")],
+    ),
+}
+
+# Figures compared against the baseline, with the noise below which changes are ignored
+COMPARED = {
+    'latency_p50_ms': 2.0,
+    'latency_p95_ms': 5.0,
+    'alloc_peak_p95_kb': 64.0,
+    'retained_kb': 256.0,
+    'bytes_per_run': 256.0,
+    'runs_per_interaction': 0.01,
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def script_runs(activity):
+    """Script runs of an activity so far, read from the app's metrics endpoint"""
+    url = f"http://{os.environ['AUDIO_SERVER_HOST']}:{os.environ['AUDIO_SERVER_PORT']}/metrics.json"
+    with urllib.request.urlopen(url, timeout=10) as response:
+        counters = json.load(response)['counters']
+    return sum(
+        counter['value'] for counter in counters
+        if counter['name'] == 'script_runs_total' and counter['labels'].get('activity') == activity
+    )
+
+
+def emitted_bytes(node):
+    """Serialized size of every element rendered in the last run"""
+    size = 0
+    proto = getattr(node, 'proto', None)
+    if proto is not None and hasattr(proto, 'ByteSize'):
+        size += proto.ByteSize()
+    for child in getattr(node, 'children', {}).values():
+        size += emitted_bytes(child)
+    return size
+
+
+class Session:
+    """One AppTest session that times every rerun it triggers"""
+
+    def __init__(self, activity, level, timeout, trace):
+        from streamlit.testing.v1 import AppTest
+
+        self.at = AppTest.from_file(os.path.join(APP_DIR, 'app2.py'), default_timeout=timeout)
+        self.trace = trace
+        self.samples = []
+        self.missing = set()
+        self.run()
+        self._select("Choose Activity", activity)
+        self._select("Difficulty Level", level)
+
+    def _select(self, label, value):
+        for box in self.at.sidebar.selectbox:
+            if box.label == label:
+                box.select(value)
+                self.run()
+                return
+        raise RuntimeError(f"No sidebar selectbox labelled {label!r}")
+
+    def run(self):
+        if self.trace:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+        started = time.perf_counter()
+        self.at.run()
+        elapsed = time.perf_counter() - started
+        peak = 0
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            peak -= before
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].value)
+        self.samples.append((elapsed, peak, emitted_bytes(self.at._tree)))
+
+    def step(self, action, label):
+        # Only the activity's own widgets; the sidebar holds navigation and the learner ID
+        at = self.at.main
+        if action == 'click':
+            button = next((b for b in at.button if b.label == label), None)
+            if button is None:
+                self.missing.add(label)
+                return
+            button.click()
+        elif action == 'type':
+            if not at.text_input:
+                self.missing.add('text input')
+                return
+            for box in at.text_input:
+                if box.label not in SEARCH_LABELS:
+                    box.input(ANSWER)
+        elif action == 'radio':
+            if not at.radio:
+                self.missing.add('radio')
+                return
+            for group in at.radio:
+                group.set_value(group.options[0])
+        elif action == 'toggle':
+            box = next((c for c in at.checkbox if c.label == label), None)
+            if box is None:
+                self.missing.add(label)
+                return
+            box.set_value(not box.value)
+        self.run()
+
+
+def run_scenario(activity, args, trace):
+    random.seed(args.seed)
+    setup, loop = SCENARIOS[activity]
+    session = Session(activity, args.level, args.timeout, trace)
+    for step in setup:
+        session.step(*step)
+    for _ in range(args.warmup):
+        for step in loop:
+            session.step(*step)
+    session.samples.clear()
+    runs_before = script_runs(activity)
+    retained_before = tracemalloc.get_traced_memory()[0] if trace else 0
+    for _ in range(args.iterations):
+        for step in loop:
+            session.step(*step)
+    retained = tracemalloc.get_traced_memory()[0] - retained_before if trace else 0
+    # Every sample is one interaction; callbacks keep each to a single script run
+    session.runs_per_interaction = (script_runs(activity) - runs_before) / max(1, len(session.samples))
+    return session, retained
+
+
+def benchmark(activity, args):
+    """Latency from an untraced pass, allocations from a second, traced pass"""
+    timed, _ = run_scenario(activity, args, trace=False)
+    tracemalloc.start()
+    try:
+        traced, retained = run_scenario(activity, args, trace=True)
+    finally:
+        tracemalloc.stop()
+    latencies = [elapsed * 1000 for elapsed, _, _ in timed.samples]
+    peaks = [peak / 1024 for _, peak, _ in traced.samples]
+    return {
+        'runs': len(latencies),
+        'latency_p50_ms': round(percentile(latencies, 0.50), 2),
+        'latency_p95_ms': round(percentile(latencies, 0.95), 2),
+        'latency_p99_ms': round(percentile(latencies, 0.99), 2),
+        'latency_max_ms': round(max(latencies), 2),
+        'alloc_peak_p95_kb': round(percentile(peaks, 0.95), 1),
+        'retained_kb': round(retained / 1024, 1),
+        'bytes_per_run': round(statistics.mean(size for _, _, size in timed.samples)),
+        'runs_per_interaction': round(timed.runs_per_interaction, 3),
+        'missing_steps': sorted(timed.missing | traced.missing),
+    }
+
+
+def compare(results, baseline, threshold):
+    """[(activity, figure, baseline, current)] for every regression beyond threshold"""
+    regressions = []
+    for activity, current in results.items():
+        previous = baseline.get(activity)
+        if not previous:
+            continue
+        for figure, noise in COMPARED.items():
+            if figure not in previous:
+                continue
+            limit = max(previous[figure] * (1 + threshold), previous[figure] + noise)
+            if current[figure] > limit:
+                regressions.append((activity, figure, previous[figure], current[figure]))
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every activity headlessly with AppTest")
+    parser.add_argument('--activities', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--level', choices=['Easy', 'Medium', 'Hard'], default='Easy')
+    parser.add_argument('--iterations', type=int, default=50, help="scripted rounds per activity")
+    parser.add_argument('--warmup', type=int, default=3, help="untimed rounds before measuring")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--timeout', type=float, default=30, help="seconds allowed per rerun")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=0.25, help="allowed fractional regression")
+    parser.add_argument('--update-baseline', action='store_true', help="write the results as the new baseline")
+    parser.add_argument('--output', help="also write the results as JSON to this path")
+    parser.add_argument('--check-reruns', action='store_true',
+                        help="fail if any interaction runs the script more than once")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='benchmark-')
+    # Isolated, deterministic environment: fake TTS, a fresh cache and database
+    os.environ['TTS_BACKENDS'] = 'fake'
+    os.environ['AUDIO_CACHE_DIR'] = os.path.join(workdir, 'audio')
+    os.environ['PROGRESS_DB'] = os.path.join(workdir, 'progress.db')
+    os.environ['AUDIO_SERVER_HOST'] = '127.0.0.1'
+    os.environ['AUDIO_SERVER_PORT'] = str(free_port())
+    os.environ['AUDIO_BASE_URL'] = f"http://127.0.0.1:{os.environ['AUDIO_SERVER_PORT']}"
+    os.environ['SERVE_METRICS'] = '1'
+
+    results = {}
+    print(
+        f"{'Activity':<26}{'runs':>6}{'p50 ms':>9}{'p95 ms':>9}{'peak KB':>10}{'kept KB':>10}{'bytes':>9}"
+        f"{'runs/click':>11}"
+    )
+    for activity in args.activities:
+        result = results[activity] = benchmark(activity, args)
+        print(
+            f"{activity:<26}{result['runs']:>6}{result['latency_p50_ms']:>9.1f}{result['latency_p95_ms']:>9.1f}"
+            f"{result['alloc_peak_p95_kb']:>10.1f}{result['retained_kb']:>10.1f}{result['bytes_per_run']:>9}"
+            f"{result['runs_per_interaction']:>11.2f}"
+        )
+        if result['missing_steps']:
+            print(f"  steps not found: {', '.join(result['missing_steps'])}", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    rerun_failures = [
+        activity for activity, result in results.items() if args.check_reruns and result['runs_per_interaction'] > 1
+    ]
+    for activity in rerun_failures:
+        print(
+            f"RERUNS {activity}: {results[activity]['runs_per_interaction']} script runs per interaction",
+            file=sys.stderr
+        )
+    if args.update_baseline:
+        # Activities left out of this run keep their previous baseline
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, encoding='utf-8') as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2)
+            f.write('\n')
+        print(f"Baseline written to {args.baseline}")
+        return 1 if rerun_failures else 0
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to record one")
+        return 1 if rerun_failures else 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold)
+    for activity, figure, previous, current in regressions:
+        print(f"REGRESSION {activity}: {figure} {previous} -> {current}", file=sys.stderr)
+    if not regressions:
+        print(f"No regressions beyond {args.threshold:.0%} of {args.baseline}")
+    return 1 if regressions or rerun_failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,48 @@
+"""Split long texts into sentence-sized chunks for separate synthesis.
+
+Each chunk is synthesized and cached on its own, so a long passage can
+start playing after its first sentence, chunks render in parallel, and an
+edited passage only re-synthesizes the sentences that changed.
+"""
+import re
+
+# Sentence end: terminal punctuation (and any closing quotes) followed by space
+SENTENCE_END = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+')
+CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+# Sentences shorter than this are joined to the next so speech does not sound choppy
+MIN_CHUNK_CHARS = 40
+MAX_CHUNK_CHARS = 250
+
+
+def _split_long(sentence, limit):
+    """Break a sentence longer than limit at clause boundaries, then at spaces"""
+    if len(sentence) <= limit:
+        return [sentence]
+    parts, current = [], ''
+    for piece in CLAUSE_END.split(sentence):
+        for word in (piece.split(' ') if len(piece) > limit else [piece]):
+            if current and len(current) + 1 + len(word) > limit:
+                parts.append(current)
+                current = word
+            else:
+                current = f'{current} {word}' if current else word
+    if current:
+        parts.append(current)
+    return parts
+
+
+def split_sentences(text, min_chars=MIN_CHUNK_CHARS, max_chars=MAX_CHUNK_CHARS):
+    """Chunks of text at sentence boundaries, each at most max_chars where possible"""
+    text = ' '.join(text.split())
+    if not text:
+        return []
+    sentences = []
+    for match in SENTENCE_END.split(text):
+        sentences.extend(_split_long(match.strip(), max_chars))
+    chunks = []
+    for sentence in filter(None, sentences):
+        if chunks and len(chunks[-1]) < min_chars and len(chunks[-1]) + 1 + len(sentence) <= max_chars:
+            chunks[-1] = f'{chunks[-1]} {sentence}'
+        else:
+            chunks.append(sentence)
+    return chunks
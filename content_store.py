@@ -0,0 +1,113 @@
+"""Immutable, indexed store of the learning content kept in content/*.json"""
+import bisect
+import json
+import os
+from types import MappingProxyType
+
+# Content sets whose levels are split into named categories; the rest are flat lists per level
+CATEGORIZED_SETS = ('vocabulary', 'flash_cards', 'sounds', 'phonemes')
+
+
+def freeze(value):
+    """Recursively turn dicts into read-only mappings and lists into tuples"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+class ContentStore:
+    """Read-only content with lookups by set, level, category and item id.
+
+    Item ids look like "vocabulary/Easy/colors/0" or "sentences/Hard/3".
+    Sound categories map names to descriptions; their items are
+    (name, description) pairs.
+    """
+
+    def __init__(self, sets):
+        self._sets = MappingProxyType({name: freeze(data) for name, data in sets.items()})
+        items = {}
+        by_level = {}
+        by_category = {}
+        for name, levels in self._sets.items():
+            for level, content in levels.items():
+                level_ids = []
+                if name in CATEGORIZED_SETS:
+                    for category, entries in content.items():
+                        if isinstance(entries, MappingProxyType):
+                            entries = tuple(entries.items())
+                        ids = []
+                        for index, entry in enumerate(entries):
+                            item_id = f"{name}/{level}/{category}/{index}"
+                            items[item_id] = entry
+                            ids.append(item_id)
+                        by_category[(name, level, category)] = tuple(ids)
+                        level_ids.extend(ids)
+                else:
+                    for index, entry in enumerate(content):
+                        item_id = f"{name}/{level}/{index}"
+                        items[item_id] = entry
+                        level_ids.append(item_id)
+                by_level[(name, level)] = tuple(level_ids)
+        self._items = MappingProxyType(items)
+        self._by_level = MappingProxyType(by_level)
+        self._by_category = MappingProxyType(by_category)
+
+    @classmethod
+    def from_directory(cls, directory):
+        """Load every <set>.json file in directory"""
+        sets = {}
+        for filename in sorted(os.listdir(directory)):
+            if filename.endswith('.json'):
+                with open(os.path.join(directory, filename), encoding='utf-8') as f:
+                    sets[filename[:-len('.json')]] = json.load(f)
+        return cls(sets)
+
+    def __getitem__(self, name):
+        """Nested level -> content view of a whole set"""
+        return self._sets[name]
+
+    def set_names(self):
+        return tuple(self._sets)
+
+    def levels(self, name):
+        return tuple(self._sets[name])
+
+    def categories(self, name, level):
+        return tuple(self._sets[name][level])
+
+    def item(self, item_id):
+        return self._items[item_id]
+
+    def item_ids(self, name, level=None, category=None):
+        """Ids of the items in a set, optionally narrowed to a level and category"""
+        if category is not None:
+            return self._by_category[(name, level, category)]
+        if level is not None:
+            return self._by_level[(name, level)]
+        return tuple(item_id for lvl in self._sets[name] for item_id in self._by_level[(name, lvl)])
+
+    def items(self, name, level=None, category=None):
+        """Items of a set, optionally narrowed to a level and category"""
+        return tuple(self._items[item_id] for item_id in self.item_ids(name, level, category))
+
+
+class WordIndex:
+    """A word list in its original order, plus an alphabetical index for prefix search"""
+    __slots__ = ('words', '_keys', '_order')
+
+    def __init__(self, words):
+        self.words = tuple(words)
+        self._order = tuple(sorted(range(len(self.words)), key=lambda i: self.words[i].lower()))
+        self._keys = tuple(self.words[i].lower() for i in self._order)
+
+    def __len__(self):
+        return len(self.words)
+
+    def search(self, prefix=''):
+        """Positions of the words starting with prefix, alphabetically; every position in order for no prefix"""
+        if not prefix:
+            return range(len(self.words))
+        prefix = prefix.lower()
+        return self._order[bisect.bisect_left(self._keys, prefix):bisect.bisect_left(self._keys, prefix + '\uffff')]
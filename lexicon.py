@@ -0,0 +1,261 @@
+"""Pronunciation lexicon read from a CMUdict-format file.
+
+The text dictionary is compiled once into a flat binary index next to it
+(<file>.lex, rebuilt when the source changes) and memory-mapped, so every
+process shares the same pages and nothing is parsed at startup. The index
+holds each word's spelling, phonemes (stress removed) and syllable count,
+plus sorted posting lists from every phoneme and every two- and
+three-letter grapheme to the words containing it.
+
+Words are numbered in frequency order when a frequency list (one word per
+line, most common first) is given, and alphabetically otherwise; queries
+return matches in that order.
+"""
+import mmap
+import os
+import re
+import struct
+import tempfile
+from array import array
+
+MAGIC = b'LEX1'
+# ARPAbet phonemes used by CMUdict; stress digits are dropped
+PHONEMES = (
+    'AA', 'AE', 'AH', 'AO', 'AW', 'AY', 'B', 'CH', 'D', 'DH', 'EH', 'ER', 'EY', 'F', 'G', 'HH',
+    'IH', 'IY', 'JH', 'K', 'L', 'M', 'N', 'NG', 'OW', 'OY', 'P', 'R', 'S', 'SH', 'T', 'TH',
+    'UH', 'UW', 'V', 'W', 'Y', 'Z', 'ZH',
+)
+PHONEME_CODES = {phoneme: code for code, phoneme in enumerate(PHONEMES)}
+VOWELS = frozenset(code for code, phoneme in enumerate(PHONEMES) if phoneme[0] in 'AEIOU')
+WORD = re.compile(r"[a-z][a-z']*")
+# Most syllables a practice word may have at each level
+LEVEL_SYLLABLES = {'Easy': 2, 'Medium': 3, 'Hard': None}
+
+HEADER = struct.Struct('<4s9I')
+SECTIONS = (
+    'word_offsets', 'words', 'pron_offsets', 'prons', 'syllables',
+    'phoneme_offsets', 'phoneme_postings', 'gram_keys', 'gram_offsets', 'gram_postings', 'alphabetical',
+)
+
+
+def gram_key(gram):
+    """Pack a grapheme of up to four bytes into one sortable integer"""
+    return int.from_bytes(gram.encode('ascii').ljust(4, b'\0'), 'big')
+
+
+def word_grams(word):
+    return {word[i:i + n] for n in (2, 3) for i in range(len(word) - n + 1)}
+
+
+def parse_cmudict(path):
+    """{word: phoneme codes} for the first pronunciation of every plain word"""
+    entries = {}
+    with open(path, encoding='latin-1') as f:
+        for line in f:
+            if not line.strip() or line.startswith(';;;'):
+                continue
+            word, *phonemes = line.split()
+            word = word.lower()
+            # Alternative pronunciations look like "read(1)"; symbols and abbreviations are skipped
+            if not WORD.fullmatch(word) or word in entries:
+                continue
+            try:
+                entries[word] = bytes(PHONEME_CODES[p.rstrip('012')] for p in phonemes)
+            except KeyError:
+                continue
+    return entries
+
+
+def read_frequencies(path):
+    ranks = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            word = line.strip().lower()
+            if word and word not in ranks:
+                ranks[word] = len(ranks)
+    return ranks
+
+
+def _pad(blob):
+    return blob + b'\0' * (-len(blob) % 4)
+
+
+def build_index(source, target, frequency_path=None):
+    """Compile a CMUdict-format file into the binary index at target"""
+    entries = parse_cmudict(source)
+    ranks = read_frequencies(frequency_path) if frequency_path else {}
+    words = sorted(entries, key=lambda word: (ranks.get(word, len(ranks)), word))
+
+    word_offsets, pron_offsets = array('I', [0]), array('I', [0])
+    spelled, prons, syllables = bytearray(), bytearray(), bytearray()
+    phoneme_words = [[] for _ in PHONEMES]
+    gram_words = {}
+    for index, word in enumerate(words):
+        pron = entries[word]
+        spelled += word.encode('ascii')
+        word_offsets.append(len(spelled))
+        prons += pron
+        pron_offsets.append(len(prons))
+        syllables.append(min(255, sum(1 for code in pron if code in VOWELS)))
+        for code in set(pron):
+            phoneme_words[code].append(index)
+        for gram in word_grams(word):
+            gram_words.setdefault(gram_key(gram), []).append(index)
+
+    def postings(lists):
+        offsets, flat = array('I', [0]), array('I')
+        for ids in lists:
+            flat.extend(ids)
+            offsets.append(len(flat))
+        return offsets, flat
+
+    phoneme_offsets, phoneme_postings = postings(phoneme_words)
+    keys = sorted(gram_words)
+    gram_offsets, gram_postings = postings(gram_words[key] for key in keys)
+    blobs = [
+        word_offsets.tobytes(), _pad(bytes(spelled)), pron_offsets.tobytes(), _pad(bytes(prons)),
+        _pad(bytes(syllables)), phoneme_offsets.tobytes(), phoneme_postings.tobytes(),
+        array('I', keys).tobytes(), gram_offsets.tobytes(), gram_postings.tobytes(),
+        array('I', sorted(range(len(words)), key=words.__getitem__)).tobytes(),
+    ]
+
+    # Header, then a table of (offset, length) per section, then the sections
+    position = HEADER.size + 8 * len(blobs)
+    table = array('I')
+    for blob in blobs:
+        table.extend((position, len(blob)))
+        position += len(blob)
+    header = HEADER.pack(MAGIC, len(words), len(keys), *([0] * 7))
+    os.makedirs(os.path.dirname(os.path.abspath(target)), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(target)), suffix='.tmp')
+    with os.fdopen(fd, 'wb') as f:
+        f.write(header)
+        f.write(table.tobytes())
+        for blob in blobs:
+            f.write(blob)
+    os.replace(tmp_path, target)
+
+
+class Lexicon:
+    """Read-only view of a compiled index; safe to share between threads"""
+
+    def __init__(self, index_path):
+        with open(index_path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._map)
+        magic, self.size, self._gram_count, *_ = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise ValueError(f"{index_path} is not a lexicon index")
+        table = view[HEADER.size:HEADER.size + 8 * len(SECTIONS)].cast('I')
+        sections = {}
+        for i, name in enumerate(SECTIONS):
+            offset, length = table[2 * i], table[2 * i + 1]
+            sections[name] = view[offset:offset + length]
+        self._words = sections['words']
+        self._prons = sections['prons']
+        self._syllables = sections['syllables']
+        self._word_offsets = sections['word_offsets'].cast('I')
+        self._pron_offsets = sections['pron_offsets'].cast('I')
+        self._phoneme_offsets = sections['phoneme_offsets'].cast('I')
+        self._phoneme_postings = sections['phoneme_postings'].cast('I')
+        self._gram_keys = sections['gram_keys'].cast('I')
+        self._gram_offsets = sections['gram_offsets'].cast('I')
+        self._gram_postings = sections['gram_postings'].cast('I')
+        self._alphabetical = sections['alphabetical'].cast('I')
+
+    @classmethod
+    def load(cls, source, frequency_path=None):
+        """Open the index for a CMUdict-format file, compiling it first if missing or stale"""
+        index_path = source + '.lex'
+        inputs = [source] + ([frequency_path] if frequency_path else [])
+        newest = max(os.path.getmtime(path) for path in inputs)
+        if not os.path.exists(index_path) or os.path.getmtime(index_path) < newest:
+            try:
+                build_index(source, index_path, frequency_path)
+            except OSError:
+                # Read-only data directory: keep the index in the temp directory instead
+                index_path = os.path.join(tempfile.gettempdir(), os.path.basename(source) + '.lex')
+                if not os.path.exists(index_path) or os.path.getmtime(index_path) < newest:
+                    build_index(source, index_path, frequency_path)
+        return cls(index_path)
+
+    def __len__(self):
+        return self.size
+
+    def word(self, index):
+        return bytes(self._words[self._word_offsets[index]:self._word_offsets[index + 1]]).decode('ascii')
+
+    def index(self, word):
+        """Index of a word, or None if it is not in the lexicon"""
+        word = word.lower()
+        lo, hi = 0, self.size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(self._alphabetical[mid]) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.size and self.word(self._alphabetical[lo]) == word:
+            return self._alphabetical[lo]
+        return None
+
+    def phonemes(self, index):
+        """ARPAbet phonemes of a word, without stress"""
+        return tuple(PHONEMES[code] for code in self.pron_codes(index))
+
+    def syllables(self, index):
+        return self._syllables[index]
+
+    def pron_codes(self, index):
+        """A word's phonemes as bytes of indexes into PHONEMES"""
+        return bytes(self._prons[self._pron_offsets[index]:self._pron_offsets[index + 1]])
+
+    def _gram_postings_for(self, gram):
+        key = gram_key(gram)
+        lo, hi = 0, self._gram_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._gram_keys[mid] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self._gram_count or self._gram_keys[lo] != key:
+            return ()
+        return self._gram_postings[self._gram_offsets[lo]:self._gram_offsets[lo + 1]]
+
+    def _candidates(self, grapheme, phonemes):
+        """Smallest posting list that every match must appear in, or None to scan all words"""
+        lists = []
+        if grapheme and len(grapheme) >= 2:
+            lists.extend(self._gram_postings_for(grapheme[i:i + 3] if len(grapheme) > 2 else grapheme)
+                         for i in range(max(1, len(grapheme) - 2)))
+        for code in phonemes:
+            lists.append(self._phoneme_postings[self._phoneme_offsets[code]:self._phoneme_offsets[code + 1]])
+        return min(lists, key=len) if lists else None
+
+    def find(self, grapheme=None, phonemes=None, level=None, limit=50):
+        """Words containing the grapheme (letters) and/or phoneme sequence, easiest for the level first.
+
+        grapheme is a spelling pattern such as "ough"; phonemes a sequence such
+        as ("TH",) or "S T R". Matches are returned in index order.
+        """
+        grapheme = grapheme.lower() if grapheme else None
+        if isinstance(phonemes, str):
+            phonemes = phonemes.split()
+        codes = bytes(PHONEME_CODES[p.upper().rstrip('012')] for p in phonemes or ())
+        max_syllables = LEVEL_SYLLABLES.get(level)
+        candidates = self._candidates(grapheme, codes)
+        indexes = range(self.size) if candidates is None else candidates
+        matches = []
+        for index in indexes:
+            if max_syllables is not None and self._syllables[index] > max_syllables:
+                continue
+            if codes and codes not in self.pron_codes(index):
+                continue
+            word = self.word(index)
+            if grapheme and grapheme not in word:
+                continue
+            matches.append(word)
+            if len(matches) >= limit:
+                break
+        return matches
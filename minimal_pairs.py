@@ -0,0 +1,60 @@
+"""Minimal pairs: words whose pronunciations differ in exactly one phoneme.
+
+Pairs are found by substitution hashing rather than comparing every word
+with every other: for each phoneme position, words are bucketed by their
+pronunciation with that position removed, so every bucket holds words that
+differ only there. The work is linear in the size of the lexicon.
+"""
+import random
+from array import array
+
+# Pairs are levelled by the syllable count of their longer word
+LEVEL_BY_SYLLABLES = {0: 'Easy', 1: 'Easy', 2: 'Medium'}
+# Words taken from each bucket, most frequent first; bounds the pairs from very common patterns
+BUCKET_LIMIT = 24
+
+
+def pair_level(syllables):
+    return LEVEL_BY_SYLLABLES.get(syllables, 'Hard')
+
+
+class MinimalPairs:
+    """Compact per-level lists of minimal pairs drawn from a lexicon"""
+    __slots__ = ('lexicon', 'pairs')
+
+    def __init__(self, lexicon, max_words=None):
+        self.lexicon = lexicon
+        # Flattened (word index, word index) pairs per level
+        self.pairs = {'Easy': array('I'), 'Medium': array('I'), 'Hard': array('I')}
+        size = len(lexicon) if max_words is None else min(max_words, len(lexicon))
+        prons = [lexicon.pron_codes(index) for index in range(size)]
+        syllables = [lexicon.syllables(index) for index in range(size)]
+        longest = max(map(len, prons), default=0)
+        for position in range(longest):
+            buckets = {}
+            for index, pron in enumerate(prons):
+                if len(pron) > position:
+                    buckets.setdefault(pron[:position] + pron[position + 1:], []).append(index)
+            for words in buckets.values():
+                if len(words) > 1:
+                    self._add_bucket(words[:BUCKET_LIMIT], prons, syllables, position)
+
+    def _add_bucket(self, words, prons, syllables, position):
+        for i, first in enumerate(words):
+            for second in words[i + 1:]:
+                # Same pronunciation, different spelling: homophones, not a minimal pair
+                if prons[first][position] == prons[second][position]:
+                    continue
+                level = pair_level(max(syllables[first], syllables[second]))
+                self.pairs[level].extend((first, second))
+
+    def count(self, level):
+        return len(self.pairs[level]) // 2
+
+    def pair(self, level, number):
+        """The numbered pair for a level as two words"""
+        pairs = self.pairs[level]
+        return self.lexicon.word(pairs[2 * number]), self.lexicon.word(pairs[2 * number + 1])
+
+    def sample(self, level, rng=random):
+        return self.pair(level, rng.randrange(self.count(level)))
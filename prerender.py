@@ -0,0 +1,92 @@
+"""Pre-render every piece of learning content into the shared audio cache.
+
+Run before deploying so learners start with a warm cache:
+
+    python prerender.py --workers 8 --retries 3
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+
+def render_with_retries(app, text, rate, retries, backoff, variants=True):
+    """Synthesize one clip, retrying transient failures with exponential backoff.
+
+    Rates other than 1 are stretched from the normal-speed clip. With
+    variants, its low-bitrate variants are encoded too when ffmpeg is available.
+    """
+    status = 'cached' if app.get_audio_cache().contains(app.audio_key(text, rate=rate)) else None
+    for attempt in range(retries + 1):
+        try:
+            key, data = app.synthesize_clip(text, rate=rate)
+            break
+        except Exception:
+            if attempt == retries:
+                raise
+            time.sleep(backoff * (2 ** attempt))
+    if variants:
+        app.get_transcoder().ensure(key, data)
+    return status or 'rendered'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Batch-synthesize all content audio into the cache")
+    parser.add_argument('--workers', type=int, default=8, help="concurrent synthesis requests")
+    parser.add_argument('--retries', type=int, default=3, help="retries per clip after the first attempt")
+    parser.add_argument('--backoff', type=float, default=1.0, help="initial retry delay in seconds")
+    parser.add_argument('--rates', nargs='+', type=float, default=[1.0],
+                        help="playback rates to render, e.g. 1 0.75 (slower rates are derived locally)")
+    parser.add_argument('--cache-dir', help="audio cache directory (defaults to AUDIO_CACHE_DIR)")
+    parser.add_argument('--no-variants', action='store_true', help="skip encoding low-bitrate variants")
+    parser.add_argument('--lexicon', action='store_true',
+                        help="also render words drawn from the pronunciation lexicon (phonics words, minimal "
+                             "pairs); with a full dictionary that is tens of thousands of clips")
+    parser.add_argument('--dry-run', action='store_true', help="only list what would be rendered")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.cache_dir:
+        os.environ['AUDIO_CACHE_DIR'] = args.cache_dir
+    import app2
+
+    jobs = [(text, round(rate, 2)) for text in app2.iter_audio_texts(lexicon=args.lexicon) for rate in args.rates]
+    if args.dry_run:
+        for text, rate in jobs:
+            print(f"{rate:g}x\t{text}")
+        print(f"{len(jobs)} clips")
+        return 0
+
+    started = time.time()
+    counts = {'cached': 0, 'rendered': 0, 'failed': 0}
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {
+            pool.submit(
+                render_with_retries, app2, text, rate, args.retries, args.backoff, not args.no_variants
+            ): (text, rate)
+            for text, rate in jobs
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            text, rate = futures[future]
+            try:
+                counts[future.result()] += 1
+            except Exception as e:
+                counts['failed'] += 1
+                print(f"FAILED ({rate:g}x) {text[:60]!r}: {e}", file=sys.stderr)
+            if done % 50 == 0 or done == len(jobs):
+                print(f"{done}/{len(jobs)} clips processed")
+
+    stats = app2.get_audio_cache().stats()
+    print(
+        f"Rendered {counts['rendered']}, already cached {counts['cached']}, failed {counts['failed']} "
+        f"in {time.time() - started:.1f}s; cache holds {stats['disk_entries']} clips "
+        f"({stats['disk_bytes'] / 1024 / 1024:.1f} MB)"
+    )
+    return 1 if counts['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
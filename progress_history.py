@@ -0,0 +1,48 @@
+"""Compact, bounded per-session answer history; every answer is also kept in the progress store"""
+import time
+from collections import deque
+from datetime import datetime
+
+# Activity and level names are stored as small integer codes
+ACTIVITIES = (
+    "Sound Recognition", "Word Listening", "Story Time", "Instructions", "Phonetic Practice",
+    "Sentence Practice", "Vocabulary", "Comprehension", "Flash Cards",
+)
+LEVELS = ("Easy", "Medium", "Hard")
+ACTIVITY_CODES = {name: code for code, name in enumerate(ACTIVITIES)}
+LEVEL_CODES = {name: code for code, name in enumerate(LEVELS)}
+
+
+def decode_event(event):
+    """Expand an (epoch, activity code, level code, correct) tuple into a readable record"""
+    timestamp, activity, level, correct = event
+    return {
+        'timestamp': datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S"),
+        'activity': ACTIVITIES[activity],
+        'level': LEVELS[level],
+        'result': 'correct' if correct else 'incorrect',
+    }
+
+
+class History:
+    """Ring buffer of the most recent answers; older ones are dropped"""
+    __slots__ = ('events',)
+
+    def __init__(self, limit=200, events=()):
+        self.events = deque(events, maxlen=limit)
+
+    def __len__(self):
+        return len(self.events)
+
+    def append(self, activity, level, correct, timestamp=None):
+        self.events.append((
+            int(time.time() if timestamp is None else timestamp),
+            ACTIVITY_CODES[activity],
+            LEVEL_CODES[level],
+            bool(correct),
+        ))
+
+    def recent(self, count=5):
+        """Readable records of the most recent in-memory events, oldest first"""
+        start = max(0, len(self.events) - count)
+        return [decode_event(self.events[i]) for i in range(start, len(self.events))]
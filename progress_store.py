@@ -0,0 +1,188 @@
+"""Durable SQLite progress store with batched, asynchronous writes.
+
+The database runs in WAL mode so dashboard reads never wait on the writer.
+All writes go through a queue drained by one background thread, which
+commits them in batches; callers on the script thread never touch the disk.
+"""
+import atexit
+import json
+import queue
+import sqlite3
+import threading
+import time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS learners (
+    learner_id TEXT PRIMARY KEY,
+    score INTEGER NOT NULL DEFAULT 0,
+    streak INTEGER NOT NULL DEFAULT 0,
+    best_streak INTEGER NOT NULL DEFAULT 0,
+    badges TEXT NOT NULL DEFAULT '[]',
+    updated_at INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    learner_id TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    activity INTEGER NOT NULL,
+    level INTEGER NOT NULL,
+    correct INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_learner_activity ON events (learner_id, activity, level, correct);
+CREATE INDEX IF NOT EXISTS events_by_learner_time ON events (learner_id, ts);
+CREATE TABLE IF NOT EXISTS card_state (
+    learner_id TEXT NOT NULL,
+    item_id TEXT NOT NULL,
+    ease REAL NOT NULL,
+    interval REAL NOT NULL,
+    repetitions INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    due REAL NOT NULL,
+    PRIMARY KEY (learner_id, item_id)
+) WITHOUT ROWID;
+"""
+
+
+def connect(path):
+    conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class ProgressStore:
+    def __init__(self, path, batch_size=100, flush_interval=0.5):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        with connect(path) as conn:
+            conn.executescript(SCHEMA)
+            # Databases created before best streaks were saved
+            if 'best_streak' not in {row[1] for row in conn.execute("PRAGMA table_info(learners)")}:
+                conn.execute("ALTER TABLE learners ADD COLUMN best_streak INTEGER NOT NULL DEFAULT 0")
+        self._read_conn = connect(path)
+        self._read_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._writer = threading.Thread(target=self._write_loop, name='progress-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.flush)
+
+    # Writes (queued)
+
+    def record_event(self, learner_id, timestamp, activity, level, correct):
+        """Queue one answer; activity and level are integer codes"""
+        self._queue.put(('event', (learner_id, int(timestamp), activity, level, int(bool(correct)))))
+
+    def save_learner(self, learner_id, score, streak, best_streak, badges):
+        """Queue a snapshot of a learner's score, streaks and badges"""
+        self._queue.put((
+            'learner', (learner_id, score, streak, best_streak, json.dumps(sorted(badges)), int(time.time()))
+        ))
+
+    def save_card(self, learner_id, item_id, ease, interval, repetitions, lapses, due):
+        """Queue the spaced-repetition state of one reviewed card"""
+        self._queue.put(('card', (learner_id, item_id, ease, interval, repetitions, lapses, due)))
+
+    def flush(self, timeout=10):
+        """Block until everything queued so far is committed"""
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        return done.wait(timeout)
+
+    def _write_loop(self):
+        conn = connect(self.path)
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] != 'flush':
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._commit(conn, batch)
+
+    def _commit(self, conn, batch):
+        events = [payload for kind, payload in batch if kind == 'event']
+        # Only the latest snapshot of each learner matters
+        learners = {payload[0]: payload for kind, payload in batch if kind == 'learner'}
+        cards = {payload[:2]: payload for kind, payload in batch if kind == 'card'}
+        try:
+            with conn:
+                if events:
+                    conn.executemany(
+                        "INSERT INTO events (learner_id, ts, activity, level, correct) VALUES (?, ?, ?, ?, ?)",
+                        events,
+                    )
+                if learners:
+                    conn.executemany(
+                        "INSERT INTO learners (learner_id, score, streak, best_streak, badges, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?) "
+                        "ON CONFLICT(learner_id) DO UPDATE SET score=excluded.score, streak=excluded.streak, "
+                        "best_streak=excluded.best_streak, badges=excluded.badges, updated_at=excluded.updated_at",
+                        list(learners.values()),
+                    )
+                if cards:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO card_state (learner_id, item_id, ease, interval, repetitions, lapses, due) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        list(cards.values()),
+                    )
+        except sqlite3.Error as e:
+            print(f"Failed to save progress batch of {len(batch)} writes: {e}")
+        for kind, payload in batch:
+            if kind == 'flush':
+                payload.set()
+
+    # Reads
+
+    def _query(self, sql, params=()):
+        with self._read_lock:
+            return self._read_conn.execute(sql, params).fetchall()
+
+    def load_learner(self, learner_id):
+        """Saved score, streaks and badges for a learner, or None if unknown"""
+        rows = self._query(
+            "SELECT score, streak, best_streak, badges FROM learners WHERE learner_id = ?", (learner_id,)
+        )
+        if not rows:
+            return None
+        score, streak, best_streak, badges = rows[0]
+        return {'score': score, 'streak': streak, 'best_streak': best_streak, 'badges': set(json.loads(badges))}
+
+    def aggregates(self, learner_id):
+        """{(activity code, level code): (attempts, correct)} from the covering index"""
+        rows = self._query(
+            "SELECT activity, level, COUNT(*), SUM(correct) FROM events "
+            "WHERE learner_id = ? GROUP BY activity, level",
+            (learner_id,),
+        )
+        return {(activity, level): (attempts, correct) for activity, level, attempts, correct in rows}
+
+    def iter_events(self, learner_id):
+        """All of a learner's events as (epoch, activity code, level code, correct), oldest first"""
+        rows = self._query(
+            "SELECT ts, activity, level, correct FROM events WHERE learner_id = ? ORDER BY ts, id",
+            (learner_id,),
+        )
+        for ts, activity, level, correct in rows:
+            yield ts, activity, level, bool(correct)
+
+    def recent_events(self, learner_id, limit):
+        """A learner's last limit events as (epoch, activity code, level code, correct), oldest first"""
+        rows = self._query(
+            "SELECT ts, activity, level, correct FROM events WHERE learner_id = ? ORDER BY ts DESC, id DESC LIMIT ?",
+            (learner_id, limit),
+        )
+        return [(ts, activity, level, bool(correct)) for ts, activity, level, correct in reversed(rows)]
+
+    def load_cards(self, learner_id, prefix):
+        """{item id: (ease, interval, repetitions, lapses, due)} for the learner's reviewed cards under prefix"""
+        rows = self._query(
+            "SELECT item_id, ease, interval, repetitions, lapses, due FROM card_state "
+            "WHERE learner_id = ? AND item_id >= ? AND item_id < ?",
+            (learner_id, prefix, prefix + '\uffff'),
+        )
+        return {item_id: values for item_id, *values in rows}
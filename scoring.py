@@ -0,0 +1,157 @@
+"""Sentence scoring by edit-distance alignment of words and characters.
+
+Accuracy is the mean of a word score and a character score, each
+1 - (edit distance / length of the longer side). Aligning instead of
+comparing position by position means one missed or extra word costs one
+edit rather than shifting every word after it.
+
+Distances use Myers' bit-parallel algorithm, which processes a whole
+column of the alignment per step, and can stop as soon as the distance is
+known to exceed a limit. References are compiled once and reused, so grading
+many answers against the same sentences is cheap:
+
+    python scoring.py answers.csv > graded.csv
+"""
+import csv
+import re
+import sys
+from functools import lru_cache
+
+WORD = re.compile(r"[\w']+")
+
+
+def words(text):
+    return tuple(WORD.findall(text.lower()))
+
+
+def characters(text):
+    return ' '.join(text.lower().split())
+
+
+def pattern_masks(sequence):
+    """{symbol: bitmask of the positions where it occurs in sequence}"""
+    masks = {}
+    for position, symbol in enumerate(sequence):
+        masks[symbol] = masks.get(symbol, 0) | (1 << position)
+    return masks
+
+
+def edit_distance(source, target, limit=None, masks=None):
+    """Levenshtein distance between two sequences (of words or characters).
+
+    With a limit, returns limit + 1 as soon as the distance is known to be
+    larger. masks may be pattern_masks(target), precomputed.
+    """
+    m, n = len(target), len(source)
+    if not m or not n:
+        distance = m or n
+        return distance if limit is None else min(distance, limit + 1)
+    if masks is None:
+        masks = pattern_masks(target)
+    full = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = full, 0, m
+    for index, symbol in enumerate(source):
+        eq = masks.get(symbol, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & full)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = mh | (~(xv | ph) & full)
+        mv = ph & xv
+        # Each remaining symbol can lower the distance by at most one
+        if limit is not None and score - (n - 1 - index) > limit:
+            return limit + 1
+    return score if limit is None else min(score, limit + 1)
+
+
+class Reference:
+    """A correct sentence prepared for repeated scoring"""
+    __slots__ = ('words', 'word_masks', 'chars', 'char_masks')
+
+    def __init__(self, text):
+        self.words = words(text)
+        self.word_masks = pattern_masks(self.words)
+        self.chars = characters(text)
+        self.char_masks = pattern_masks(self.chars)
+
+    def accuracy(self, user_input, min_accuracy=0):
+        """Accuracy in percent; alignment stops early, scoring 0, once min_accuracy is out of reach"""
+        user_words = words(user_input)
+        if not user_words:
+            return 0
+        floor = min_accuracy / 100
+        word_length = max(len(user_words), len(self.words))
+        # The character score is at most 1, so the word score alone must reach 2 * floor - 1
+        word_limit = int(2 * (1 - floor) * word_length) if floor else None
+        distance = edit_distance(user_words, self.words, word_limit, self.word_masks)
+        if word_limit is not None and distance > word_limit:
+            return 0
+        word_score = 1 - distance / word_length
+
+        user_chars = characters(user_input)
+        char_length = max(len(user_chars), len(self.chars))
+        char_limit = int((1 - (2 * floor - word_score)) * char_length) if floor else None
+        distance = edit_distance(user_chars, self.chars, char_limit, self.char_masks)
+        if char_limit is not None and distance > char_limit:
+            return 0
+        char_score = 1 - distance / char_length
+        return (word_score + char_score) / 2 * 100
+
+
+@lru_cache(maxsize=1024)
+def compile_reference(text):
+    return Reference(text)
+
+
+def sentence_accuracy(user_input, reference, min_accuracy=0):
+    """Accuracy in percent of user_input against the reference sentence"""
+    return compile_reference(reference).accuracy(user_input, min_accuracy)
+
+
+def score_batch(pairs, min_accuracy=0):
+    """Accuracies for many (input, reference) pairs.
+
+    Each distinct reference is compiled once and each distinct pair scored once.
+    """
+    compiled = {}
+    scored = {}
+    scores = []
+    for pair in pairs:
+        score = scored.get(pair)
+        if score is None:
+            user_input, reference = pair
+            ref = compiled.get(reference)
+            if ref is None:
+                ref = compiled[reference] = Reference(reference)
+            score = scored[pair] = ref.accuracy(user_input, min_accuracy)
+        scores.append(score)
+    return scores
+
+
+def main(argv=None):
+    """Grade a CSV with 'input' and 'reference' columns, writing it back with an 'accuracy' column"""
+    argv = sys.argv[1:] if argv is None else argv
+    if len(argv) != 1:
+        print("usage: python scoring.py answers.csv > graded.csv", file=sys.stderr)
+        return 2
+    with open(argv[0], newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    scores = score_batch((row['input'], row['reference']) for row in rows)
+    if not rows:
+        return 0
+    writer = csv.DictWriter(sys.stdout, fieldnames=[*rows[0], 'accuracy'])
+    writer.writeheader()
+    for row, score in zip(rows, scores):
+        writer.writerow({**row, 'accuracy': f"{score:.1f}"})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,324 @@
+"""Procedural sound effects for the Sound Recognition game.
+
+Every sound in content/sounds.json is synthesized locally with vectorized
+NumPy DSP instead of asking TTS to read out its description: instruments are
+harmonic tones shaped by ADSR envelopes, nature sounds are spectrally
+filtered noise, and animal calls are pitch-gliding harmonic tones. Output is
+deterministic (noise is seeded per sound) and encoded as 16 kHz mono WAV,
+which the app compresses further when ffmpeg is available.
+"""
+import zlib
+
+import numpy as np
+
+from tts_backends import encode_wav
+
+SAMPLE_RATE = 16000
+# Bump when a recipe changes so cached clips are regenerated
+ENGINE_VERSION = 1
+
+
+def _time(duration):
+    return np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+
+
+def adsr(n, attack=0.01, decay=0.1, sustain=0.7, release=0.2):
+    """Attack-decay-sustain-release envelope of n samples; times in seconds"""
+    a, d, r = (int(x * SAMPLE_RATE) for x in (attack, decay, release))
+    s = max(0, n - a - d - r)
+    envelope = np.concatenate([
+        np.linspace(0, 1, a, endpoint=False),
+        np.linspace(1, sustain, d, endpoint=False),
+        np.full(s, sustain),
+        np.linspace(sustain, 0, r),
+    ])
+    return np.pad(envelope, (0, max(0, n - len(envelope))))[:n]
+
+
+def harmonic(frequency, duration, partials=((1, 1.0),), vibrato=(0, 0)):
+    """Sum of partials (frequency multiple, amplitude) of a fixed or gliding pitch.
+
+    frequency is a number or an array of per-sample frequencies (a glide);
+    vibrato is (rate in Hz, depth as a fraction of the pitch).
+    """
+    t = _time(duration)
+    frequency = np.broadcast_to(np.asarray(frequency, dtype=float), t.shape)
+    rate, depth = vibrato
+    if depth:
+        frequency = frequency * (1 + depth * np.sin(2 * np.pi * rate * t))
+    phase = 2 * np.pi * np.cumsum(frequency) / SAMPLE_RATE
+    multiples = np.array([m for m, _ in partials], dtype=float)[:, None]
+    amplitudes = np.array([a for _, a in partials], dtype=float)[:, None]
+    # Drop partials above the Nyquist frequency
+    amplitudes = amplitudes * (multiples * frequency.max() < SAMPLE_RATE / 2)
+    return (amplitudes * np.sin(multiples * phase)).sum(axis=0)
+
+
+def glide(points, duration):
+    """Per-sample frequency interpolated through (time fraction, Hz) points"""
+    t = np.linspace(0, 1, int(duration * SAMPLE_RATE))
+    fractions, frequencies = zip(*points)
+    return np.interp(t, fractions, frequencies)
+
+
+def filtered_noise(rng, duration, low=0, high=None, tilt=0.0):
+    """White noise band-limited to [low, high] Hz, with a spectral tilt in dB per octave"""
+    n = int(duration * SAMPLE_RATE)
+    spectrum = np.fft.rfft(rng.standard_normal(n))
+    frequencies = np.fft.rfftfreq(n, 1 / SAMPLE_RATE)
+    mask = (frequencies >= low) & (frequencies <= (high or SAMPLE_RATE / 2))
+    if tilt:
+        mask = mask * (np.maximum(frequencies, 20) / 1000) ** (tilt / 6.02)
+    noise = np.fft.irfft(spectrum * mask, n)
+    return noise / (np.abs(noise).max() or 1)
+
+
+def bursts(duration, starts, length, shape=8.0):
+    """Envelope that is a sharply decaying burst at each start time (seconds)"""
+    t = _time(duration)
+    envelope = np.zeros_like(t)
+    for start in starts:
+        since = t - start
+        active = (since >= 0) & (since < length)
+        envelope += active * np.exp(-shape * np.clip(since, 0, length) / length)
+    return envelope
+
+
+def sequence(parts, gap=0.05):
+    """Concatenate clips with short silences between them"""
+    silence = np.zeros(int(gap * SAMPLE_RATE))
+    out = []
+    for part in parts:
+        out.extend((part, silence))
+    return np.concatenate(out[:-1])
+
+
+def note(frequency, duration, partials, **envelope):
+    tone = harmonic(frequency, duration, partials)
+    return tone * adsr(len(tone), **envelope)
+
+
+def _decaying_partials(frequency, duration, partials, decay):
+    """Partials that each fade exponentially, higher ones faster (plucked and struck sounds)"""
+    t = _time(duration)
+    multiples = np.array([m for m, _ in partials], dtype=float)[:, None]
+    amplitudes = np.array([a for _, a in partials], dtype=float)[:, None]
+    amplitudes = amplitudes * (multiples * frequency < SAMPLE_RATE / 2)
+    fades = np.exp(-t[None, :] * decay * np.sqrt(multiples))
+    return (amplitudes * fades * np.sin(2 * np.pi * frequency * multiples * t[None, :])).sum(axis=0)
+
+
+# Animals
+
+def cat(rng):
+    duration = 1.1
+    pitch = glide([(0, 450), (0.35, 750), (1, 420)], duration)
+    tone = harmonic(pitch, duration, [(1, 1), (2, 0.6), (3, 0.4), (4, 0.2), (5, 0.1)], vibrato=(6, 0.01))
+    return tone * adsr(len(tone), attack=0.08, decay=0.2, sustain=0.8, release=0.35)
+
+
+def dog(rng):
+    def bark():
+        duration = 0.22
+        pitch = glide([(0, 320), (0.3, 420), (1, 250)], duration)
+        tone = harmonic(pitch, duration, [(1, 1), (2, 0.7), (3, 0.5), (4, 0.3)])
+        rough = filtered_noise(rng, duration, 300, 3000)
+        return (tone + 0.5 * rough) * adsr(len(tone), attack=0.005, decay=0.05, sustain=0.6, release=0.12)
+    return sequence([bark(), bark()], gap=0.18)
+
+
+def cow(rng):
+    duration = 1.8
+    pitch = glide([(0, 110), (0.2, 140), (0.8, 135), (1, 95)], duration)
+    tone = harmonic(pitch, duration, [(n, 1 / n) for n in range(1, 12)], vibrato=(4, 0.01))
+    return tone * adsr(len(tone), attack=0.15, decay=0.2, sustain=0.8, release=0.5)
+
+
+def bird(rng):
+    chirps = []
+    for _ in range(4):
+        duration = rng.uniform(0.07, 0.12)
+        pitch = glide([(0, rng.uniform(2500, 3200)), (1, rng.uniform(3800, 4500))], duration)
+        tone = harmonic(pitch, duration)
+        chirps.append(tone * adsr(len(tone), attack=0.01, decay=0.02, sustain=0.8, release=0.03))
+    return sequence(chirps, gap=0.08)
+
+
+def duck(rng):
+    def quack():
+        duration = 0.25
+        pitch = glide([(0, 260), (1, 220)], duration)
+        # Odd harmonics give the nasal, reedy buzz
+        tone = harmonic(pitch, duration, [(n, 1 / n) for n in range(1, 16, 2)])
+        return np.tanh(2 * tone) * adsr(len(tone), attack=0.01, decay=0.05, sustain=0.7, release=0.1)
+    return sequence([quack(), quack(), quack()], gap=0.1)
+
+
+def horse(rng):
+    duration = 1.4
+    pitch = glide([(0, 500), (0.15, 900), (0.6, 700), (1, 350)], duration)
+    tone = harmonic(pitch, duration, [(1, 1), (2, 0.5), (3, 0.3)], vibrato=(14, 0.06))
+    return tone * adsr(len(tone), attack=0.05, decay=0.2, sustain=0.7, release=0.4)
+
+
+def sheep(rng):
+    duration = 1.0
+    pitch = glide([(0, 290), (0.2, 330), (1, 300)], duration)
+    tone = harmonic(pitch, duration, [(1, 1), (2, 0.8), (3, 0.5), (4, 0.3), (5, 0.2)], vibrato=(9, 0.05))
+    return tone * adsr(len(tone), attack=0.05, decay=0.1, sustain=0.8, release=0.3)
+
+
+# Nature
+
+def rain(rng):
+    duration = 2.0
+    hiss = filtered_noise(rng, duration, 2000, 7000) * 0.4
+    drops = bursts(duration, rng.uniform(0, duration, 60), 0.015, shape=6)
+    return hiss + drops * filtered_noise(rng, duration, 1000, 5000)
+
+
+def wind(rng):
+    duration = 2.5
+    t = _time(duration)
+    gusts = 0.5 + 0.5 * np.sin(2 * np.pi * 0.4 * t + 1) * np.sin(2 * np.pi * 0.13 * t)
+    return filtered_noise(rng, duration, 150, 900, tilt=-3) * (0.3 + 0.7 * gusts)
+
+
+def thunder(rng):
+    duration = 2.5
+    rumble = filtered_noise(rng, duration, 20, 250, tilt=-6)
+    crack = filtered_noise(rng, duration, 500, 6000) * bursts(duration, [0.05], 0.25, shape=10)
+    t = _time(duration)
+    return rumble * np.exp(-1.2 * t) * np.minimum(1, t / 0.08) + 0.6 * crack
+
+
+def waves(rng):
+    duration = 3.0
+    t = _time(duration)
+    swell = np.sin(np.pi * t / duration) ** 2
+    return filtered_noise(rng, duration, 80, 2500, tilt=-3) * swell
+
+
+def fire(rng):
+    duration = 2.0
+    roar = filtered_noise(rng, duration, 40, 400, tilt=-4) * 0.5
+    crackles = bursts(duration, rng.uniform(0, duration, 40), 0.006, shape=5)
+    return roar + crackles * filtered_noise(rng, duration, 1500, 7000)
+
+
+def leaves(rng):
+    duration = 2.0
+    t = _time(duration)
+    rustle = 0.3 + np.abs(np.sin(2 * np.pi * 1.7 * t)) * (0.5 + 0.5 * np.sin(2 * np.pi * 0.6 * t))
+    return filtered_noise(rng, duration, 2500, 7500) * rustle
+
+
+def stream(rng):
+    duration = 2.5
+    t = _time(duration)
+    babble = 0.7 + 0.3 * np.sin(2 * np.pi * 3.1 * t) * np.sin(2 * np.pi * 1.3 * t)
+    return filtered_noise(rng, duration, 600, 3500) * babble
+
+
+# Instruments (C major arpeggio unless noted)
+
+ARPEGGIO = (261.63, 329.63, 392.00, 523.25)
+
+
+def piano(rng):
+    partials = [(1, 1), (2, 0.5), (3, 0.25), (4, 0.12), (5, 0.06)]
+    return sequence([_decaying_partials(f, 0.45, partials, decay=6) for f in ARPEGGIO], gap=0.02)
+
+
+def guitar(rng):
+    duration = 1.8
+    partials = [(n, 1 / n) for n in range(1, 9)]
+    chord = (196.00, 246.94, 293.66, 392.00)
+    out = np.zeros(int(duration * SAMPLE_RATE))
+    for i, frequency in enumerate(chord):
+        # Strings in a strum start a few milliseconds apart
+        offset = int(i * 0.025 * SAMPLE_RATE)
+        string = _decaying_partials(frequency, duration, partials, decay=3)
+        out[offset:] += string[:len(out) - offset]
+    return out
+
+
+def drums(rng):
+    def kick():
+        duration = 0.3
+        pitch = glide([(0, 150), (0.3, 60), (1, 45)], duration)
+        tone = harmonic(pitch, duration)
+        return tone * np.exp(-_time(duration) * 14)
+
+    def snare():
+        duration = 0.2
+        noise = filtered_noise(rng, duration, 1000, 7000)
+        body = harmonic(190, duration)
+        return (0.7 * noise + 0.4 * body) * np.exp(-_time(duration) * 20)
+
+    return sequence([kick(), snare(), kick(), kick(), snare()], gap=0.1)
+
+
+def violin(rng):
+    # Sawtooth-like spectrum with a slow bow attack and vibrato
+    partials = [(n, 1 / n) for n in range(1, 14)]
+    notes = []
+    for frequency in (392.00, 440.00, 493.88):
+        tone = harmonic(frequency, 0.6, partials, vibrato=(5.5, 0.008))
+        notes.append(tone * adsr(len(tone), attack=0.12, decay=0.1, sustain=0.85, release=0.15))
+    return sequence(notes, gap=0.02)
+
+
+def flute(rng):
+    notes = []
+    for frequency in (523.25, 587.33, 659.25, 783.99):
+        tone = harmonic(frequency, 0.4, [(1, 1), (2, 0.2), (3, 0.05)], vibrato=(5, 0.005))
+        breath = filtered_noise(rng, 0.4, 1500, 5000) * 0.08
+        notes.append((tone + breath) * adsr(len(tone), attack=0.06, decay=0.05, sustain=0.9, release=0.1))
+    return sequence(notes, gap=0.03)
+
+
+def trumpet(rng):
+    # Brassy: strong upper harmonics that grow with loudness
+    partials = [(1, 1), (2, 0.9), (3, 0.8), (4, 0.6), (5, 0.5), (6, 0.35), (7, 0.25), (8, 0.15)]
+    notes = []
+    for frequency, duration in ((349.23, 0.25), (349.23, 0.25), (440.00, 0.7)):
+        tone = harmonic(frequency, duration, partials)
+        notes.append(np.tanh(1.5 * tone / 3) * adsr(len(tone), attack=0.03, decay=0.05, sustain=0.9, release=0.08))
+    return sequence(notes, gap=0.04)
+
+
+def xylophone(rng):
+    # Struck bars ring with inharmonic overtones and die away quickly
+    partials = [(1, 1), (3.93, 0.4), (9.2, 0.15)]
+    notes = [_decaying_partials(2 * f, 0.35, partials, decay=12) for f in ARPEGGIO + ARPEGGIO[::-1][1:]]
+    return sequence(notes, gap=0.01)
+
+
+RECIPES = {
+    'cat': cat, 'dog': dog, 'cow': cow, 'bird': bird, 'duck': duck, 'horse': horse, 'sheep': sheep,
+    'rain': rain, 'wind': wind, 'thunder': thunder, 'waves': waves, 'fire': fire, 'leaves': leaves,
+    'stream': stream, 'piano': piano, 'guitar': guitar, 'drums': drums, 'violin': violin,
+    'flute': flute, 'trumpet': trumpet, 'xylophone': xylophone,
+}
+
+
+def has_sound(name):
+    return name in RECIPES
+
+
+def synthesize(name):
+    """Float samples in [-1, 1] at SAMPLE_RATE for a named sound"""
+    rng = np.random.default_rng(zlib.crc32(name.encode('utf-8')))
+    samples = RECIPES[name](rng)
+    # Short fades so clips never start or stop with a click
+    fade = min(len(samples) // 2, int(0.005 * SAMPLE_RATE))
+    ramp = np.linspace(0, 1, fade)
+    samples[:fade] *= ramp
+    samples[len(samples) - fade:] *= ramp[::-1]
+    return 0.9 * samples / (np.abs(samples).max() or 1)
+
+
+def render(name):
+    """WAV bytes for a named sound"""
+    return encode_wav(np.round(synthesize(name) * 32767).astype(np.int16), SAMPLE_RATE)
@@ -0,0 +1,104 @@
+"""SM-2 spaced repetition with a heap of cards ordered by due time"""
+import heapq
+import time
+from collections import deque
+from dataclasses import dataclass
+
+DAY = 24 * 60 * 60
+# A forgotten card comes back within the same session
+RELEARN_DELAY = 60
+MIN_EASE = 1.3
+
+# Answer qualities on the SM-2 0-5 scale
+AGAIN = 1
+GOOD = 4
+
+
+@dataclass(slots=True)
+class CardState:
+    ease: float = 2.5
+    interval: float = 0.0
+    repetitions: int = 0
+    lapses: int = 0
+    due: float = 0.0
+
+
+def review(card, quality, now):
+    """Update card in place after an answer of the given quality (0-5)"""
+    if quality < 3:
+        card.repetitions = 0
+        card.lapses += 1
+        card.interval = 0.0
+        card.due = now + RELEARN_DELAY
+    else:
+        card.repetitions += 1
+        if card.repetitions == 1:
+            card.interval = 1.0
+        elif card.repetitions == 2:
+            card.interval = 6.0
+        else:
+            card.interval = round(card.interval * card.ease, 2)
+        card.due = now + card.interval * DAY
+    card.ease = max(MIN_EASE, card.ease + 0.1 - (5 - quality) * (0.08 + (5 - quality) * 0.02))
+    return card
+
+
+class Deck:
+    """One learner's schedule for a set of items.
+
+    Reviewed cards sit in a heap keyed by due time; entries made stale by a
+    later review are skipped when they surface, so choosing and grading a
+    card are O(log n). Cards never seen wait in their content order and are
+    introduced once nothing is due.
+    """
+    __slots__ = ('cards', 'heap', 'new')
+
+    def __init__(self, item_ids, saved=None):
+        saved = saved or {}
+        self.cards = {item_id: CardState(*saved[item_id]) for item_id in item_ids if item_id in saved}
+        self.heap = [(card.due, item_id) for item_id, card in self.cards.items()]
+        heapq.heapify(self.heap)
+        self.new = deque(item_id for item_id in item_ids if item_id not in self.cards)
+
+    def __len__(self):
+        return len(self.cards) + len(self.new)
+
+    def _top(self):
+        while self.heap:
+            due, item_id = self.heap[0]
+            if self.cards[item_id].due == due:
+                return item_id
+            heapq.heappop(self.heap)
+        return None
+
+    def next_card(self, now=None, skip=None):
+        """Most overdue card, else a new one, else the next to fall due; never skip if avoidable"""
+        now = time.time() if now is None else now
+        top = self._top()
+        if top == skip and top is not None:
+            # Look past the skipped card without disturbing the heap
+            entry = heapq.heappop(self.heap)
+            second = self._top()
+            heapq.heappush(self.heap, entry)
+        else:
+            second = top
+        if second is not None and self.cards[second].due <= now:
+            return second
+        for item_id in self.new:
+            if item_id != skip:
+                return item_id
+        return second if second is not None else top
+
+    def grade(self, item_id, quality, now=None):
+        """Record an answer; returns the card's updated state"""
+        now = time.time() if now is None else now
+        card = self.cards.get(item_id)
+        if card is None:
+            card = self.cards[item_id] = CardState()
+            if self.new[0] == item_id:
+                self.new.popleft()
+            else:
+                self.new.remove(item_id)
+        review(card, quality, now)
+        heapq.heappush(self.heap, (card.due, item_id))
+        return card
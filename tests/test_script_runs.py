@@ -0,0 +1,50 @@
+import os
+import sys
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import metrics
+
+APP = os.path.join(ROOT, 'app2.py')
+
+# Activity and the buttons clicked in it, in order
+INTERACTIONS = [
+    ("Flash Cards", ["🔄 Flip Card", "Next ➡️", "⬅️ Previous"]),
+    ("Sentence Practice", ["🔄 New Sentence", "➡️ Next"]),
+    ("Comprehension Challenge", ["🔄 Start New Challenge", "📝 Ready for Questions"]),
+    ("Phonetic Fun", ["🔊 Practice", "➡️ Next"]),
+]
+
+
+@pytest.fixture
+def script_runs(monkeypatch, tmp_path):
+    """List that grows by one activity name per script run of the app"""
+    monkeypatch.setenv('TTS_BACKENDS', 'fake')
+    monkeypatch.setenv('AUDIO_CACHE_DIR', str(tmp_path / 'audio'))
+    monkeypatch.setenv('PROGRESS_DB', str(tmp_path / 'progress.db'))
+    runs = []
+    inc = metrics.Metrics.inc
+
+    def counting_inc(self, name, value=1, **labels):
+        if name == 'script_runs_total':
+            runs.append(labels['activity'])
+        return inc(self, name, value, **labels)
+
+    monkeypatch.setattr(metrics.Metrics, 'inc', counting_inc)
+    return runs
+
+
+@pytest.mark.parametrize('activity, labels', INTERACTIONS)
+def test_each_click_runs_the_script_once(script_runs, activity, labels):
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.run()
+    at.sidebar.selectbox[0].select(activity).run()
+    for label in labels:
+        before = len(script_runs)
+        [button for button in at.button if button.label == label][0].click().run()
+        assert not at.exception
+        assert script_runs[before:] == [activity], label
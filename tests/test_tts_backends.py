@@ -0,0 +1,41 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_cache import AudioCache, cache_key
+from tts_backends import BackendChain, FakeBackend, fetch_clip
+
+
+class FlakyBackend(FakeBackend):
+    """Fake primary backend that fails until switched on"""
+    name = 'flaky'
+
+    def __init__(self):
+        super().__init__()
+        self.up = False
+
+    def synthesize(self, text, lang='en', slow=False):
+        if not self.up:
+            raise ConnectionError("primary is down")
+        return super().synthesize(text, lang, slow)
+
+
+def test_fallback_clip_is_upgraded_to_primary(tmp_path):
+    primary = FlakyBackend()
+    chain = BackendChain([primary, FakeBackend()], cooldown=0)
+    cache = AudioCache(str(tmp_path))
+    primary_key = cache_key('hello', 'en', False, 'flaky')
+    fallback_key = cache_key('hello', 'en', False, 'fake')
+
+    key, _ = fetch_clip(cache, chain, 'hello')
+    assert key == fallback_key
+    assert not cache.contains(primary_key)
+
+    primary.up = True
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        key, _ = fetch_clip(cache, chain, 'hello', executor=executor)
+    assert key == fallback_key
+    assert cache.contains(primary_key)
+    assert fetch_clip(cache, chain, 'hello')[0] == primary_key
@@ -0,0 +1,82 @@
+"""Compact HTML diffs between a learner's answer and the correct text"""
+import difflib
+from functools import lru_cache
+from html import escape
+from string import punctuation as PUNCTUATION
+
+# Text the learner typed that is not in the answer, and answer text they missed
+REMOVED = 'diff-removed'
+ADDED = 'diff-added'
+# Changed words at least this similar are diffed character by character
+SIMILAR = 0.6
+
+
+def _merge(segments):
+    """Join runs of segments that share a class, so each run becomes one span"""
+    merged = []
+    for css_class, text in segments:
+        if merged and merged[-1][0] == css_class:
+            merged[-1] = (css_class, merged[-1][1] + text)
+        else:
+            merged.append((css_class, text))
+    return merged
+
+
+def _char_segments(typed, expected):
+    matcher = difflib.SequenceMatcher(None, typed, expected, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            yield None, typed[i1:i2]
+            continue
+        if i1 < i2:
+            yield REMOVED, typed[i1:i2]
+        if j1 < j2:
+            yield ADDED, expected[j1:j2]
+
+
+def _refine(typed, expected):
+    """Character diff of a changed stretch when it resembles the answer, else whole-word marks"""
+    if difflib.SequenceMatcher(None, typed, expected, autojunk=False).quick_ratio() >= SIMILAR:
+        yield from _char_segments(typed, expected)
+        yield None, ' '
+    else:
+        if typed:
+            yield REMOVED, typed + ' '
+        if expected:
+            yield ADDED, expected + ' '
+
+
+def _word_segments(typed_words, expected_words):
+    # Words are aligned ignoring surrounding punctuation, which is then diffed per character
+    matcher = difflib.SequenceMatcher(
+        None, [w.strip(PUNCTUATION) for w in typed_words], [w.strip(PUNCTUATION) for w in expected_words],
+        autojunk=False,
+    )
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op != 'equal':
+            yield from _refine(' '.join(typed_words[i1:i2]), ' '.join(expected_words[j1:j2]))
+            continue
+        for typed, expected in zip(typed_words[i1:i2], expected_words[j1:j2]):
+            if typed == expected:
+                yield None, typed + ' '
+            else:
+                yield from _char_segments(typed, expected)
+                yield None, ' '
+
+
+@lru_cache(maxsize=512)
+def diff_html(user_input, correct_text):
+    """HTML marking what to remove from and add to user_input to get correct_text (case-insensitive)"""
+    typed = user_input.lower().split()
+    expected = correct_text.lower().split()
+    if typed == expected:
+        return escape(' '.join(expected))
+    parts = []
+    for css_class, text in _merge(_word_segments(typed, expected)):
+        if css_class is None:
+            parts.append(escape(text))
+        else:
+            # Keep the separating space outside the span
+            body = text.rstrip(' ')
+            parts.append(f'<span class="{css_class}">{escape(body)}</span>{text[len(body):]}')
+    return ''.join(parts).rstrip()
@@ -0,0 +1,121 @@
+"""Pitch-preserving time-stretch of cached clips (WSOLA).
+
+Slower (or faster) speech is derived from the normal-speed clip instead of
+a second TTS request. WSOLA cuts the input into overlapping frames and, for
+each output frame, picks the input frame near its nominal position that
+best continues the previous one, so periods line up and pitch is kept.
+WAV clips are decoded with the standard library; other formats (gTTS MP3)
+need ffmpeg, which also re-encodes the stretched result compactly.
+"""
+import hashlib
+import io
+import subprocess
+import wave
+from array import array
+
+import numpy as np
+
+from tts_backends import encode_wav, fetch_clip
+
+# Clips decoded through ffmpeg are resampled to this rate
+DECODE_RATE = 16000
+FRAME_SECONDS = 0.03
+TOLERANCE_SECONDS = 0.01
+
+
+class UndecodableAudio(ValueError):
+    """Raised when a clip cannot be decoded to samples in this environment"""
+
+
+def stretched_key(key, rate):
+    """Cache key of the clip cached under key, played at rate"""
+    return hashlib.sha256(f'{key}:x{rate:.2f}'.encode('ascii')).hexdigest()
+
+
+def can_stretch(backend, ffmpeg=None):
+    """Whether clips from backend can be decoded, and so stretched, here"""
+    return ffmpeg is not None or backend.audio_format == 'wav'
+
+
+def decode(data, ffmpeg=None):
+    """(float samples in [-1, 1], sample rate) of mono audio bytes"""
+    if data[:4] == b'RIFF' and data[8:12] == b'WAVE':
+        with wave.open(io.BytesIO(data)) as wav:
+            if wav.getsampwidth() != 2:
+                raise UndecodableAudio(f"unsupported WAV sample width {wav.getsampwidth()}")
+            channels, sample_rate = wav.getnchannels(), wav.getframerate()
+            pcm = np.frombuffer(wav.readframes(wav.getnframes()), dtype='<i2')
+        pcm = pcm[:len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1)
+        return pcm / 32768.0, sample_rate
+    if not ffmpeg:
+        raise UndecodableAudio("decoding compressed audio needs ffmpeg")
+    result = subprocess.run(
+        [ffmpeg, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0', '-ac', '1', '-ar', str(DECODE_RATE),
+         '-f', 's16le', 'pipe:1'],
+        input=data,
+        capture_output=True,
+        timeout=20,
+        check=True,
+    )
+    return np.frombuffer(result.stdout, dtype='<i2') / 32768.0, DECODE_RATE
+
+
+def wsola(samples, rate, sample_rate):
+    """Samples played at rate (below 1 is slower) with their pitch unchanged"""
+    if rate == 1 or len(samples) == 0:
+        return samples
+    size = int(FRAME_SECONDS * sample_rate) // 2 * 2
+    hop = size // 2
+    tolerance = int(TOLERANCE_SECONDS * sample_rate)
+    # A periodic Hann window overlap-adds to exactly 1 at 50% overlap
+    window = np.hanning(size + 1)[:size]
+    padded = np.pad(samples, (tolerance, 2 * tolerance + hop + size))
+    frames = int(len(samples) / (hop * rate)) + 1
+    out = np.zeros(frames * hop + size)
+    previous = tolerance
+    for k in range(frames):
+        nominal = tolerance + int(k * hop * rate)
+        if k:
+            # Best match for the natural continuation of the previous frame
+            natural = padded[previous + hop:previous + hop + size]
+            region = padded[nominal - tolerance:nominal + tolerance + size]
+            position = nominal - tolerance + int(np.argmax(np.correlate(region, natural, 'valid')))
+        else:
+            position = nominal
+        out[k * hop:k * hop + size] += window * padded[position:position + size]
+        previous = position
+    return out[:int(len(samples) / rate)]
+
+
+def stretch(data, rate, ffmpeg=None):
+    """WAV bytes of an encoded clip played at rate"""
+    samples, sample_rate = decode(data, ffmpeg)
+    stretched = wsola(samples, rate, sample_rate)
+    pcm = array('h')
+    pcm.frombytes(np.clip(np.round(stretched * 32767), -32768, 32767).astype('<i2').tobytes())
+    return encode_wav(pcm, sample_rate)
+
+
+def fetch_stretched(cache, chain, text, rate, lang='en', executor=None, ffmpeg=None, compact=None):
+    """Return (cache key, audio bytes) for text spoken at rate.
+
+    The normal-speed clip is fetched and stretched locally, and the result
+    passed through compact (WAV bytes to smaller bytes) when given; both are
+    cached. When the clip cannot be decoded here (MP3 without ffmpeg) the
+    backend's own slow speech is used for any rate below 1.
+    """
+    key, data = fetch_clip(cache, chain, text, lang, False, executor=executor)
+    if rate == 1:
+        return key, data
+    target = stretched_key(key, rate)
+
+    def create():
+        stretched = stretch(data, rate, ffmpeg)
+        return compact(stretched) if compact else stretched
+
+    try:
+        return target, cache.get_or_create(target, create)
+    except UndecodableAudio:
+        if rate > 1:
+            return key, data
+        return fetch_clip(cache, chain, text, lang, True, executor=executor)
@@ -0,0 +1,138 @@
+"""Bandwidth-optimized variants of cached clips, encoded with ffmpeg.
+
+Every clip can have a speech-tuned Opus variant and a low-bitrate mono MP3
+variant, stored in the same audio cache under keys derived from the
+original's. Variants are only kept when smaller than the original. When
+ffmpeg is not installed nothing is transcoded and the originals are served
+as before.
+"""
+import hashlib
+import shutil
+import subprocess
+import threading
+import time
+
+# name: ffmpeg output arguments, in order of preference (smallest first)
+VARIANTS = {
+    'opus': ['-c:a', 'libopus', '-b:a', '16k', '-application', 'voip', '-ar', '16000', '-f', 'ogg'],
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '32k', '-ar', '22050', '-f', 'mp3'],
+}
+# <source> type of each variant, so browsers skip codecs they cannot play without fetching
+TYPES = {'opus': 'audio/ogg; codecs=opus', 'mp3': 'audio/mpeg'}
+# Variants every browser can play; once one exists the original need not be offered
+UNIVERSAL = frozenset({'mp3'})
+
+
+def variant_key(key, variant):
+    """Cache key of one variant of the clip cached under key"""
+    return hashlib.sha256(f'{key}:{variant}'.encode('ascii')).hexdigest()
+
+
+class Transcoder:
+    """Create and look up variants of cached clips.
+
+    Missing variants are encoded on `executor` when one is given, so the
+    request that first plays a clip is never held up by ffmpeg. Clips that
+    fail to encode, or encode no smaller, are not retried.
+    """
+
+    def __init__(self, cache, executor=None, ffmpeg=None, timeout=20.0, metrics=None):
+        self.cache = cache
+        self.executor = executor
+        self.ffmpeg = ffmpeg or shutil.which('ffmpeg')
+        self.timeout = timeout
+        self.metrics = metrics
+        self._skipped = set()
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def available(self):
+        return self.ffmpeg is not None
+
+    def encode(self, data, variant):
+        """Transcode encoded audio bytes into one variant"""
+        started = time.perf_counter()
+        result = subprocess.run(
+            [self.ffmpeg, '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0', '-ac', '1', '-vn',
+             *VARIANTS[variant], 'pipe:1'],
+            input=data,
+            capture_output=True,
+            timeout=self.timeout,
+            check=True,
+        )
+        if self.metrics is not None:
+            self.metrics.observe('transcode_seconds', time.perf_counter() - started, variant=variant)
+        return result.stdout
+
+    def compact(self, data, variant='mp3'):
+        """data encoded as variant when ffmpeg is available and that is smaller, else data unchanged"""
+        if not self.available():
+            return data
+        try:
+            encoded = self.encode(data, variant)
+        except (OSError, subprocess.SubprocessError) as e:
+            if self.metrics is not None:
+                self.metrics.inc('transcode_failures_total', variant=variant, error=type(e).__name__)
+            return data
+        return encoded if encoded and len(encoded) < len(data) else data
+
+    def ensure(self, key, data):
+        """Encode and cache every missing variant of a clip; returns how many were added"""
+        try:
+            return self._ensure(key, data)
+        finally:
+            with self._lock:
+                self._pending.discard(key)
+
+    def _ensure(self, key, data):
+        if not self.available():
+            return 0
+        added = 0
+        for variant in VARIANTS:
+            target = variant_key(key, variant)
+            with self._lock:
+                if target in self._skipped:
+                    continue
+            if self.cache.contains(target):
+                continue
+            try:
+                encoded = self.cache.single_flight(target, lambda: self.encode(data, variant))
+            except (OSError, subprocess.SubprocessError) as e:
+                encoded = None
+                if self.metrics is not None:
+                    self.metrics.inc('transcode_failures_total', variant=variant, error=type(e).__name__)
+            if not encoded or len(encoded) >= len(data):
+                with self._lock:
+                    self._skipped.add(target)
+                continue
+            self.cache.put(target, encoded)
+            added += 1
+        return added
+
+    def sources(self, key, data):
+        """(key, bytes, variant) to offer for a clip, smallest first, ending with the original if needed.
+
+        Missing variants are scheduled in the background; the original
+        (variant None) is dropped once a variant every browser plays exists.
+        """
+        if not self.available():
+            return [(key, data, None)]
+        found, missing = [], False
+        for variant in VARIANTS:
+            target = variant_key(key, variant)
+            encoded = self.cache.get(target) if self.cache.contains(target) else None
+            if encoded is not None:
+                found.append((target, encoded, variant))
+            else:
+                with self._lock:
+                    missing = missing or target not in self._skipped
+        if missing and self.executor is not None:
+            with self._lock:
+                schedule = key not in self._pending
+                self._pending.add(key)
+            if schedule:
+                self.executor.submit(self.ensure, key, data)
+        found.sort(key=lambda source: len(source[1]))
+        if not any(variant in UNIVERSAL for _, _, variant in found):
+            found.append((key, data, None))
+        return found
@@ -0,0 +1,240 @@
+"""Pluggable text-to-speech backends with per-backend timeouts and a fallback chain.
+
+Backends are named in the TTS_BACKENDS environment variable, in order of
+preference, each with an optional timeout in seconds, e.g. "gtts:8,espeak:5".
+"""
+import array
+import hashlib
+import io
+import math
+import shutil
+import subprocess
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from audio_cache import cache_key
+
+
+class BackendUnavailable(RuntimeError):
+    """Raised when a backend cannot run in this environment"""
+
+
+def encode_wav(samples, sample_rate):
+    """Encode a sequence of 16-bit PCM samples as a mono WAV file"""
+    pcm = array.array('h', samples)
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+class TTSBackend:
+    """Base class: turn text into encoded audio bytes"""
+    name = None
+    # Container of the returned audio, e.g. 'wav' or 'mp3'
+    audio_format = None
+    default_timeout = 10.0
+
+    def __init__(self, timeout=None):
+        self.timeout = self.default_timeout if timeout is None else timeout
+
+    def available(self):
+        return True
+
+    def synthesize(self, text, lang='en', slow=False):
+        raise NotImplementedError
+
+
+class GTTSBackend(TTSBackend):
+    """Google Translate TTS over the network, returns MP3"""
+    name = 'gtts'
+    audio_format = 'mp3'
+    default_timeout = 8.0
+
+    def synthesize(self, text, lang='en', slow=False):
+        from gtts import gTTS
+
+        tts = gTTS(text=text, lang=lang, slow=slow, timeout=self.timeout)
+        audio_fp = io.BytesIO()
+        tts.write_to_fp(audio_fp)
+        return audio_fp.getvalue()
+
+
+class EspeakBackend(TTSBackend):
+    """Local offline synthesis through the espeak-ng (or espeak) command, returns WAV"""
+    name = 'espeak'
+    audio_format = 'wav'
+    default_timeout = 5.0
+    words_per_minute = {False: 160, True: 110}
+
+    def __init__(self, timeout=None):
+        super().__init__(timeout)
+        self.executable = shutil.which('espeak-ng') or shutil.which('espeak')
+
+    def available(self):
+        return self.executable is not None
+
+    def synthesize(self, text, lang='en', slow=False):
+        if not self.executable:
+            raise BackendUnavailable("espeak-ng is not installed")
+        result = subprocess.run(
+            [self.executable, '-v', lang, '-s', str(self.words_per_minute[bool(slow)]), '--stdout', text],
+            capture_output=True,
+            timeout=self.timeout,
+            check=True,
+        )
+        return result.stdout
+
+
+class FakeBackend(TTSBackend):
+    """Deterministic offline backend for tests and load runs.
+
+    Produces a WAV tone (or silence) whose pitch is derived from the text and
+    whose length grows with it, so different strings yield different clips.
+    """
+    name = 'fake'
+    audio_format = 'wav'
+    default_timeout = 1.0
+    sample_rate = 8000
+
+    def __init__(self, timeout=None, silent=False, latency=0.0):
+        super().__init__(timeout)
+        self.silent = silent
+        self.latency = latency
+
+    def synthesize(self, text, lang='en', slow=False):
+        if self.latency:
+            time.sleep(self.latency)
+        digest = hashlib.sha256(f"{lang}:{text}".encode('utf-8')).digest()
+        frequency = 220 + digest[0] * 2
+        seconds = min(10.0, 0.3 + 0.05 * len(text)) * (1.5 if slow else 1.0)
+        count = int(seconds * self.sample_rate)
+        if self.silent:
+            return encode_wav([0] * count, self.sample_rate)
+        step = 2 * math.pi * frequency / self.sample_rate
+        return encode_wav((int(8000 * math.sin(step * i)) for i in range(count)), self.sample_rate)
+
+
+BACKENDS = {
+    'gtts': GTTSBackend,
+    'espeak': EspeakBackend,
+    'fake': FakeBackend,
+}
+
+
+class BackendChain:
+    """Try backends in order, moving on when one fails or exceeds its timeout.
+
+    A backend that fails is skipped for `cooldown` seconds so a slow upstream
+    does not cost every request a full timeout. When `metrics` is given,
+    per-backend latency and failures are recorded in it.
+    """
+
+    def __init__(self, backends, cooldown=30.0, max_workers=8, metrics=None):
+        if not backends:
+            raise ValueError("at least one TTS backend is required")
+        self.backends = list(backends)
+        self.cooldown = cooldown
+        self.metrics = metrics
+        self._skip_until = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tts-backend')
+
+    @property
+    def primary(self):
+        return self.backends[0]
+
+    @property
+    def fallbacks(self):
+        return self.backends[1:]
+
+    def healthy(self, backend):
+        """Whether backend is outside its failure cooldown"""
+        with self._lock:
+            return self._skip_until.get(backend.name, 0) <= time.monotonic()
+
+    def _mark_failed(self, backend):
+        with self._lock:
+            self._skip_until[backend.name] = time.monotonic() + self.cooldown
+
+    def synthesize(self, text, lang='en', slow=False, backends=None):
+        """Return (backend name, audio bytes) from the first backend that succeeds"""
+        backends = self.backends if backends is None else backends
+        candidates = [b for b in backends if self.healthy(b)] or backends
+        last_error = None
+        for backend in candidates:
+            started = time.perf_counter()
+            future = self._pool.submit(backend.synthesize, text, lang, slow)
+            try:
+                audio = future.result(timeout=backend.timeout)
+                if self.metrics is not None:
+                    self.metrics.observe('tts_synthesis_seconds', time.perf_counter() - started, backend=backend.name)
+                return backend.name, audio
+            except FutureTimeoutError:
+                last_error = TimeoutError(f"{backend.name} timed out after {backend.timeout:g}s")
+            except Exception as e:
+                last_error = e
+            if self.metrics is not None:
+                self.metrics.inc('tts_failures_total', backend=backend.name, error=type(last_error).__name__)
+            self._mark_failed(backend)
+        raise last_error
+
+
+def parse_backend_spec(spec):
+    """Build backends from a spec like "gtts:8,espeak:5,fake" """
+    backends = []
+    for item in spec.split(','):
+        name, _, timeout = item.strip().partition(':')
+        if not name:
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend '{name}', expected one of {', '.join(BACKENDS)}")
+        backends.append(BACKENDS[name](timeout=float(timeout) if timeout else None))
+    return backends
+
+
+def create_backend_chain(spec, metrics=None):
+    """Backend chain for spec, dropping backends that cannot run here"""
+    backends = parse_backend_spec(spec)
+    usable = [b for b in backends if b.available()]
+    for backend in backends:
+        if usable and backend not in usable:
+            print(f"TTS backend '{backend.name}' is not available here and will not be used")
+    return BackendChain(usable or backends, metrics=metrics)
+
+
+def fetch_clip(cache, chain, text, lang='en', slow=False, executor=None):
+    """Return (cache key, audio bytes) for text, synthesizing through chain on a miss.
+
+    The primary backend's clip is preferred. If only a fallback clip is cached
+    it is returned immediately and, when an executor is given, the primary
+    backend is retried in the background so the cache upgrades itself.
+    """
+    primary_key = cache_key(text, lang, slow, chain.primary.name)
+    data = cache.get(primary_key)
+    if data is not None:
+        return primary_key, data
+
+    def render(backends=None):
+        name, audio = chain.synthesize(text, lang, slow, backends)
+        key = cache_key(text, lang, slow, name)
+        cache.put(key, audio)
+        return key, audio
+
+    for backend in chain.fallbacks:
+        key = cache_key(text, lang, slow, backend.name)
+        if cache.contains(key):
+            data = cache.get(key)
+            if data is not None:
+                if executor is not None and chain.healthy(chain.primary):
+                    executor.submit(
+                        cache.single_flight, primary_key, lambda: render([chain.primary])
+                    )
+                return key, data
+    return cache.single_flight(primary_key, render)